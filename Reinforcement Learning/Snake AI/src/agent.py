@@ -5,18 +5,25 @@
 # Implements a Deep Q-Learning agent that learns to play Snake game
 # using neural networks and experience replay
 
+import argparse
 import torch
 import random
 import numpy as np
-from collections import deque
 from game import SnakeGameAI, Direction, Point
-from model import Linear_QNet, QTrainer
-from helper import plot
+from model import Linear_QNet, Conv_QNet, QTrainer
+from memory import ReplayBuffer, PrioritizedReplayBuffer
+from observation import grid_shape, grid_observation, game_features
+from helper import MetricsLogger, start_viewer
+from checkpoint import CHECKPOINT_PATH, save_checkpoint, load_checkpoint
 
 # Hyperparameters for training
 MAX_MEMORY = 100_000  # Maximum size of experience replay buffer
 BATCH_SIZE = 1000     # Number of experiences to sample for training
 LR = 0.001           # Learning rate for neural network
+GRID_MEMORY = 20_000  # Replay capacity with grid observations (~3 KB per state)
+
+# One-hot play_step action for each action index [straight, right, left]
+MOVES = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
 
 # =====================================
 # DEEP Q-LEARNING AGENT CLASS
@@ -28,16 +35,48 @@ class Agent:
     Uses neural network to approximate Q-values and epsilon-greedy exploration.
     """
 
-    def __init__(self):
+    def __init__(self, prioritized=False, max_memory=None, target_sync=0, tau=0.0,
+                 double=False, observation='features', short_every=1):
         """
         Initialize the agent with neural network, memory buffer, and hyperparameters.
+
+        Args:
+            prioritized: Sample replay memory by TD error instead of uniformly
+            max_memory: Capacity of the replay memory (default MAX_MEMORY, or
+                GRID_MEMORY for grid observations)
+            target_sync: Train steps between hard target network updates (0: none)
+            tau: Polyak factor of soft target network updates (0: none)
+            double: Use the Double-DQN target
+            observation: 'features' for the 11 danger/direction/food flags,
+                'grid' for the occupancy grid of observation.py with a conv network
+            short_every: Calls to train_short_memory per short-memory update;
+                above 1 the transitions are collected and trained as one batch
         """
         self.n_games = 0
         self.epsilon = 0 # randomness
         self.gamma = 0.9 # discount rate
-        self.memory = deque(maxlen=MAX_MEMORY) # popleft()
-        self.model = Linear_QNet(11, 256, 3)
-        self.trainer = QTrainer(self.model, lr=LR, gamma=self.gamma)
+        self.prioritized = prioritized
+        self.observation = observation
+        self.short_every = short_every
+        self._short = [] # transitions waiting for the next short-memory update
+        if observation == 'grid':
+            state_shape, state_dtype = grid_shape(), np.uint8
+            self.model = Conv_QNet(*state_shape, 3)
+        else:
+            state_shape, state_dtype = (11,), np.float32
+            self.model = Linear_QNet(11, 256, 3)
+        self.state_shape = state_shape
+        # float32 input buffer reused by every action selection, and a tensor view of it
+        self._inputs = np.zeros((1, *state_shape), dtype=np.float32)
+        self._input_tensor = torch.from_numpy(self._inputs)
+        if max_memory is None:
+            max_memory = GRID_MEMORY if observation == 'grid' else MAX_MEMORY
+        if prioritized:
+            self.memory = PrioritizedReplayBuffer(max_memory, state_shape, state_dtype)
+        else:
+            self.memory = ReplayBuffer(max_memory, state_shape, state_dtype) # overwrites oldest when full
+        self.trainer = QTrainer(self.model, lr=LR, gamma=self.gamma, target_sync=target_sync,
+                                tau=tau, double=double)
 
     # =====================================
     # STATE REPRESENTATION
@@ -47,6 +86,7 @@ class Agent:
         """
         Extract the current state of the game as an 11-dimensional feature vector.
         Includes danger detection, movement direction, and food location relative to snake head.
+        With grid observations, returns the occupancy grid of observation.py instead.
         
         Args:
             game: Current SnakeGameAI instance
@@ -54,6 +94,9 @@ class Agent:
         Returns:
             numpy array representing the current state
         """
+        if self.observation == 'grid':
+            return grid_observation(game)
+
         head = game.snake[0]
         # Define points in each direction from the snake head
         point_l = Point(head.x - 20, head.y)
@@ -101,6 +144,27 @@ class Agent:
 
         return np.array(state, dtype=int)
 
+    def get_states(self, games, out=None):
+        """
+        States of several games at once, identical to get_state on each game.
+        Features are computed with array operations over all games
+        (observation.game_features).
+
+        Args:
+            games: SnakeGameAI instances
+            out: Optional array of shape (len(games), *state shape) to fill
+
+        Returns:
+            The filled array
+        """
+        if self.observation == 'grid':
+            if out is None:
+                out = np.empty((len(games), *self.state_shape), dtype=np.uint8)
+            for game, grid in zip(games, out):
+                grid_observation(game, grid)
+            return out
+        return game_features(games, out)
+
     # =====================================
     # MEMORY AND TRAINING
     # =====================================
@@ -116,29 +180,48 @@ class Agent:
             next_state: Resulting state
             done: Whether episode ended
         """
-        self.memory.append((state, action, reward, next_state, done)) # popleft if MAX_MEMORY is reached
+        self.memory.push(state, action, reward, next_state, done) # overwrites oldest if MAX_MEMORY is reached
 
     def train_long_memory(self):
         """
         Train the neural network using a batch of experiences from memory buffer.
         Implements experience replay to improve learning stability.
         """
-        if len(self.memory) > BATCH_SIZE:
-            mini_sample = random.sample(self.memory, BATCH_SIZE) # list of tuples
-        else:
-            mini_sample = self.memory
-
-        states, actions, rewards, next_states, dones = zip(*mini_sample)
+        if self.prioritized:
+            # weight the loss by importance sampling and feed TD errors back as priorities
+            *batch, weights, indices = self.memory.sample(BATCH_SIZE)
+            td_errors = self.trainer.train_step(*batch, weights=weights)
+            self.memory.update_priorities(indices, td_errors)
+            return
+
+        # whole memory while it holds fewer than BATCH_SIZE transitions
+        states, actions, rewards, next_states, dones = self.memory.sample(BATCH_SIZE)
         self.trainer.train_step(states, actions, rewards, next_states, dones)
-        #for state, action, reward, nexrt_state, done in mini_sample:
-        #    self.trainer.train_step(state, action, reward, next_state, done)
 
     def train_short_memory(self, state, action, reward, next_state, done):
         """
-        Train the neural network on a single experience immediately.
-        Used for online learning during game play.
+        Train the neural network on recent experience during game play.
+        Takes a single transition or a batch of them (one per environment);
+        with short_every > 1 they are collected and trained together every
+        short_every calls.
         """
-        self.trainer.train_step(state, action, reward, next_state, done)
+        if self.short_every == 1:
+            self.trainer.train_step(state, action, reward, next_state, done)
+            return
+        self._short.append((state, action, reward, next_state, done))
+        if len(self._short) >= self.short_every:
+            self.flush_short_memory()
+
+    def flush_short_memory(self):
+        """Run the short-memory update on the transitions collected so far."""
+        if not self._short:
+            return
+        if np.ndim(self._short[0][4]) == 0:
+            batch = [np.array(field) for field in zip(*self._short)]
+        else:
+            batch = [np.concatenate(field) for field in zip(*self._short)]
+        self._short = []
+        self.trainer.train_step(*batch)
 
     # =====================================
     # ACTION SELECTION
@@ -162,29 +245,145 @@ class Agent:
             move = random.randint(0, 2)
             final_move[move] = 1
         else:
-            state0 = torch.tensor(state, dtype=torch.float)
-            prediction = self.model(state0)
-            move = torch.argmax(prediction).item()
+            # first row of the shared input buffer, no per-step tensor
+            self._inputs[0] = state
+            with torch.inference_mode():
+                move = int(self.model(self._input_tensor[:1]).argmax())
             final_move[move] = 1
 
         return final_move
 
+    def get_actions(self, states):
+        """
+        Select actions for many environments at once with the epsilon-greedy
+        rule of get_action and a single forward pass.
+
+        Args:
+            states: Array of shape (n, *state shape), one state per environment
+
+        Returns:
+            Integer array of n action indices (0 straight, 1 right, 2 left)
+        """
+        n = len(states)
+        self.epsilon = 80 - self.n_games
+        explore = np.random.randint(0, 201, size=n) < self.epsilon
+        if explore.all():
+            return np.random.randint(0, 3, size=n)
+        actions = self._predict(states).argmax(dim=1).numpy()
+        if explore.any():
+            actions[explore] = np.random.randint(0, 3, size=int(explore.sum()))
+        return actions
+
+    def _predict(self, states):
+        """
+        Q-values of a batch of states without autograd bookkeeping.
+        The states are copied into the preallocated input buffer, which grows
+        when a larger batch arrives.
+
+        Args:
+            states: Array of shape (n, *state shape)
+
+        Returns:
+            Tensor of shape (n, 3)
+        """
+        n = len(states)
+        if n > len(self._inputs):
+            self._inputs = np.zeros((n, *self.state_shape), dtype=np.float32)
+            self._input_tensor = torch.from_numpy(self._inputs)
+        self._inputs[:n] = states
+        with torch.inference_mode():
+            return self.model(self._input_tensor[:n])
+
 # =====================================
 # TRAINING LOOP
 # =====================================
 
-def train():
+class TrainingRun:
+    """
+    Bookkeeping shared by all training loops: resuming from a checkpoint,
+    running statistics, the metrics log, saving the best model and periodic
+    checkpoints.
+    """
+
+    def __init__(self, agent, resume=None, dashboard=False, checkpoint_every=50,
+                 checkpoint_memory=True):
+        """
+        Restore the agent if resuming and open the metrics log.
+
+        Args:
+            agent: Agent being trained
+            resume: Checkpoint file to continue from
+            dashboard: Start the plot viewer process
+            checkpoint_every: Games between checkpoints (0 disables them)
+            checkpoint_memory: Include the replay memory in checkpoints
+        """
+        self.agent = agent
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_memory = checkpoint_memory
+        self.total_score = 0
+        self.record = 0
+        if resume:
+            stats = load_checkpoint(agent, resume)
+            self.total_score = stats['total_score']
+            self.record = stats['record']
+            print('Resumed from', resume, 'at game', agent.n_games)
+        self.logger = MetricsLogger(append=bool(resume))
+        if dashboard:
+            start_viewer(self.logger.path)
+
+    def end_game(self, score):
+        """
+        Count a finished game: save a new record model, log the result and
+        write a checkpoint when one is due.
+
+        Args:
+            score: Final score of the game
+        """
+        agent = self.agent
+        agent.n_games += 1
+
+        if score > self.record:
+            self.record = score
+            agent.model.save()
+
+        print('Game', agent.n_games, 'Score', score, 'Record:', self.record)
+
+        self.total_score += score
+        mean_score = self.total_score / agent.n_games
+        self.logger.log(agent.n_games, score, mean_score, self.record)
+
+        if self.checkpoint_every and agent.n_games % self.checkpoint_every == 0:
+            save_checkpoint(agent, {'total_score': self.total_score, 'record': self.record},
+                            include_memory=self.checkpoint_memory)
+
+def train(headless=False, render_every=0, prioritized=False, dashboard=None,
+          resume=None, checkpoint_every=50, checkpoint_memory=True,
+          target_sync=0, tau=0.0, double=False, observation='features', short_every=1):
     """
     Main training loop for the Deep Q-Learning agent.
     Runs continuous episodes, collecting experiences and training the neural network.
-    Tracks scores and displays real-time performance plots.
+    Logs scores to the metrics file, optionally shown live by a viewer process.
+
+    Args:
+        headless: Run the game without a window or frame limiter
+        render_every: In headless mode, draw every N-th episode (0 never draws)
+        prioritized: Use prioritized experience replay
+        dashboard: Start the plot viewer process (defaults to on unless headless)
+        resume: Checkpoint file to continue from
+        checkpoint_every: Games between checkpoints (0 disables them)
+        checkpoint_memory: Include the replay memory in checkpoints
+        target_sync: Train steps between hard target network updates (0: none)
+        tau: Polyak factor of soft target network updates (0: none)
+        double: Use the Double-DQN target
+        observation: 'features' or 'grid' (see Agent)
+        short_every: Steps per short-memory update (see Agent)
     """
-    plot_scores = []
-    plot_mean_scores = []
-    total_score = 0
-    record = 0
-    agent = Agent()
-    game = SnakeGameAI()
+    agent = Agent(prioritized=prioritized, target_sync=target_sync, tau=tau, double=double,
+                  observation=observation, short_every=short_every)
+    if dashboard is None:
+        dashboard = not headless
+    run = TrainingRun(agent, resume, dashboard, checkpoint_every, checkpoint_memory)
+    game = SnakeGameAI(headless=headless, render_every=render_every)
     while True:
         # get old state
         state_old = agent.get_state(game)
@@ -203,27 +402,124 @@ def train():
         agent.remember(state_old, final_move, reward, state_new, done)
 
         if done:
-            # train long memory, plot result
+            # train long memory, log result
             game.reset()
-            agent.n_games += 1
             agent.train_long_memory()
+            run.end_game(score)
 
-            if score > record:
-                record = score
-                agent.model.save()
-
-            print('Game', agent.n_games, 'Score', score, 'Record:', record)
-
-            plot_scores.append(score)
-            total_score += score
-            mean_score = total_score / agent.n_games
-            plot_mean_scores.append(mean_score)
-            plot(plot_scores, plot_mean_scores)
+def train_batched(envs=8, short_every=1, prioritized=False, dashboard=False,
+                  resume=None, checkpoint_every=50, checkpoint_memory=True,
+                  target_sync=0, tau=0.0, double=False, observation='features'):
+    """
+    Training loop over several headless games stepped in lockstep.
+    Each step selects the actions of all games with one batched forward pass
+    (Agent.get_actions) and stores their transitions with one write.
+
+    Args:
+        envs: Number of games played at the same time
+        short_every: Steps per short-memory update over all games' transitions
+        prioritized: Use prioritized experience replay
+        dashboard: Start the plot viewer process
+        resume: Checkpoint file to continue from
+        checkpoint_every: Games between checkpoints (0 disables them)
+        checkpoint_memory: Include the replay memory in checkpoints
+        target_sync: Train steps between hard target network updates (0: none)
+        tau: Polyak factor of soft target network updates (0: none)
+        double: Use the Double-DQN target
+        observation: 'features' or 'grid' (see Agent)
+    """
+    agent = Agent(prioritized=prioritized, target_sync=target_sync, tau=tau, double=double,
+                  observation=observation, short_every=short_every)
+    run = TrainingRun(agent, resume, dashboard, checkpoint_every, checkpoint_memory)
+
+    games = [SnakeGameAI(headless=True) for _ in range(envs)]
+    states = agent.get_states(games)
+    next_states = np.empty_like(states)
+    rewards = np.empty(envs, dtype=np.float32)
+    dones = np.empty(envs, dtype=np.bool_)
+    while True:
+        actions = agent.get_actions(states)
+        finished = []
+        for i, game in enumerate(games):
+            rewards[i], dones[i], score = game.play_step(MOVES[actions[i]])
+            if dones[i]:
+                finished.append(score)
+        agent.get_states(games, next_states)
+
+        # copies: the step buffers are reused while a short-memory batch is pending
+        agent.train_short_memory(states.copy(), actions, rewards.copy(), next_states.copy(), dones.copy())
+        agent.memory.extend(states, actions, rewards, next_states, dones)
+
+        # finished games restart; their first state replaces the terminal one
+        states, next_states = next_states, states
+        for i in np.flatnonzero(dones):
+            games[i].reset()
+            states[i] = agent.get_state(games[i])
+
+        for score in finished:
+            agent.train_long_memory()
+            run.end_game(score)
 
 # =====================================
 # SCRIPT EXECUTION
 # =====================================
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the Deep Q-Learning Snake agent.')
+    parser.add_argument('--headless', action='store_true',
+                        help='run without a window or frame limiter')
+    parser.add_argument('--render-every', type=int, default=0,
+                        help='in headless mode, draw every N-th episode')
+    parser.add_argument('--prioritized', action='store_true',
+                        help='sample replay memory by TD error (sum-tree)')
+    parser.add_argument('--dashboard', action=argparse.BooleanOptionalAction, default=None,
+                        help='show the live plot viewer (default: on unless --headless)')
+    parser.add_argument('--resume', nargs='?', const=CHECKPOINT_PATH, default=None,
+                        help=f'continue from a checkpoint (default: {CHECKPOINT_PATH})')
+    parser.add_argument('--checkpoint-every', type=int, default=50,
+                        help='games between checkpoints, 0 disables them')
+    parser.add_argument('--no-checkpoint-memory', action='store_true',
+                        help='leave the replay memory out of checkpoints')
+    parser.add_argument('--target-sync', type=int, default=0,
+                        help='train steps between hard target network updates (0: none)')
+    parser.add_argument('--tau', type=float, default=0.0,
+                        help='Polyak factor of soft target network updates (0: none)')
+    parser.add_argument('--double', action='store_true',
+                        help='use the Double-DQN target (needs --target-sync or --tau)')
+    parser.add_argument('--observation', choices=('features', 'grid'), default='features',
+                        help='11 hand-made features or the occupancy grid with a conv network')
+    parser.add_argument('--envs', type=int, default=1,
+                        help='play N headless games in lockstep with batched action selection')
+    parser.add_argument('--short-every', type=int, default=1,
+                        help='steps per short-memory update')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='collect experience in K worker processes')
+    parser.add_argument('--sync-every', type=int, default=10,
+                        help='updates between weight broadcasts to the workers')
+    args = parser.parse_args()
+    if args.double and not (args.target_sync or args.tau):
+        parser.error('--double needs a target network: set --target-sync or --tau')
+
     # Start training the agent
-    train()
\ No newline at end of file
+    if args.workers > 0:
+        from parallel import train_parallel
+        train_parallel(workers=args.workers, sync_every=args.sync_every,
+                       prioritized=args.prioritized, dashboard=bool(args.dashboard),
+                       resume=args.resume, checkpoint_every=args.checkpoint_every,
+                       checkpoint_memory=not args.no_checkpoint_memory,
+                       target_sync=args.target_sync, tau=args.tau, double=args.double,
+                       observation=args.observation)
+    elif args.envs > 1:
+        train_batched(envs=args.envs, short_every=args.short_every,
+                      prioritized=args.prioritized, dashboard=bool(args.dashboard),
+                      resume=args.resume, checkpoint_every=args.checkpoint_every,
+                      checkpoint_memory=not args.no_checkpoint_memory,
+                      target_sync=args.target_sync, tau=args.tau, double=args.double,
+                      observation=args.observation)
+    else:
+        train(headless=args.headless, render_every=args.render_every,
+              prioritized=args.prioritized, dashboard=args.dashboard,
+              resume=args.resume, checkpoint_every=args.checkpoint_every,
+              checkpoint_memory=not args.no_checkpoint_memory,
+              target_sync=args.target_sync, tau=args.tau, double=args.double,
+              observation=args.observation, short_every=args.short_every)
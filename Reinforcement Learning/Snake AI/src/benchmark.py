@@ -0,0 +1,567 @@
+
+# =====================================
+# PERFORMANCE BENCHMARKS FOR SNAKE AI
+# =====================================
+# Small, self-contained timing scripts used to check that performance changes
+# to the environment and the learner actually pay off.
+#
+# Usage:
+#   python benchmark.py headless
+#   python benchmark.py vector
+#   python benchmark.py train-step
+#   python benchmark.py memory
+#   python benchmark.py prioritized
+#   python benchmark.py target
+#   python benchmark.py observation
+#   python benchmark.py actions
+#   python benchmark.py features
+
+import argparse
+import random
+import sys
+import time
+from collections import deque
+import numpy as np
+import torch
+from game import SnakeGameAI, Point, BLOCK_SIZE
+from model import Linear_QNet, QTrainer
+from memory import ReplayBuffer
+from agent import Agent, MOVES
+from vector_env import VectorSnakeEnv
+from observation import (grid_shape, grid_observation, vector_grid_observation, FEATURES,
+                         CLOCKWISE, game_features, vector_features)
+
+# =====================================
+# ENVIRONMENT THROUGHPUT
+# =====================================
+
+def _random_action():
+    """Return a random one-hot action [straight, right, left]."""
+    action = [0, 0, 0]
+    action[random.randint(0, 2)] = 1
+    return action
+
+def steps_per_second(game, steps):
+    """
+    Measure how many play_step calls per second a game can sustain.
+
+    Args:
+        game: SnakeGameAI instance to drive with random actions
+        steps: Number of steps to time
+
+    Returns:
+        Steps per second
+    """
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, done, _ = game.play_step(_random_action())
+        if done:
+            game.reset()
+    return steps / (time.perf_counter() - start)
+
+def bench_headless(args):
+    """
+    Compare the windowed, frame-limited game with the headless game.
+    The windowed run needs a display (or SDL_VIDEODRIVER=dummy).
+    """
+    headless = steps_per_second(SnakeGameAI(headless=True), args.steps)
+    print(f'headless : {headless:12,.0f} steps/s')
+    if args.skip_render:
+        return
+    rendered = steps_per_second(SnakeGameAI(), args.render_steps)
+    print(f'rendered : {rendered:12,.0f} steps/s')
+    print(f'speedup  : {headless / rendered:12,.1f}x')
+
+def _food_cell(game, cols):
+    """Flat cell index of a SnakeGameAI's food."""
+    return int(game.food.y) // BLOCK_SIZE * cols + int(game.food.x) // BLOCK_SIZE
+
+def check_vector_env(steps, n_envs=16):
+    """
+    Assert that VectorSnakeEnv follows SnakeGameAI.play_step exactly: both are
+    stepped in lockstep with the same random actions and the env's food is
+    synced to the games' food, then rewards, done flags, scores and heads are compared.
+
+    Args:
+        steps: Transitions to compare
+        n_envs: Games stepped together
+
+    Returns:
+        Tuple of (transitions compared, games finished)
+    """
+    games = [SnakeGameAI(headless=True) for _ in range(n_envs)]
+    env = VectorSnakeEnv(n_envs, seed=0)
+    env.food[:] = [_food_cell(game, env.cols) for game in games]
+    rng = np.random.default_rng(0)
+    finished = 0
+    for _ in range(max(1, steps // n_envs)):
+        # random moves that avoid danger when they can (and now and then do not),
+        # so games also end by self-collision and by the frame limit, not only at walls
+        scores = rng.random((n_envs, 3)) + 2 * (vector_features(env)[:, :3] == 0)
+        scores[rng.random(n_envs) < 0.01] = 0
+        actions = scores.argmax(axis=1)
+        rewards, dones, scores = env.step(actions)
+        for i, game in enumerate(games):
+            reward, done, score = game.play_step(MOVES[actions[i]])
+            assert (reward, done) == (rewards[i], dones[i]), f'game {i}: reward/done differ'
+            assert score == scores[i], f'game {i}: score differs'
+            if done:
+                game.reset()
+                finished += 1
+            else:
+                assert (env.head_x[i], env.head_y[i]) == (int(game.head.x) // BLOCK_SIZE,
+                                                          int(game.head.y) // BLOCK_SIZE), \
+                    f'game {i}: head differs'
+            # new food (after eating or a reset) comes from the game's RNG
+            env.food[i] = _food_cell(game, env.cols)
+    return max(1, steps // n_envs) * n_envs, finished
+
+def bench_vector(args):
+    """
+    Compare transitions per second of one headless game with VectorSnakeEnv.
+    Checks first that VectorSnakeEnv steps exactly like SnakeGameAI.
+    """
+    checked, finished = check_vector_env(args.check_states)
+    print(f'identical            : {checked:,} transitions, {finished:,} games')
+    single = steps_per_second(SnakeGameAI(headless=True), args.steps)
+    print(f'SnakeGameAI x1       : {single:12,.0f} transitions/s')
+    env = VectorSnakeEnv(args.envs, seed=0)
+    batches = max(1, args.steps // args.envs)
+    actions = env.rng.integers(0, 3, size=(batches, args.envs))
+    start = time.perf_counter()
+    for batch in actions:
+        env.step(batch)
+    vector = batches * args.envs / (time.perf_counter() - start)
+    print(f'VectorSnakeEnv x{args.envs:<5}: {vector:12,.0f} transitions/s')
+    print(f'speedup              : {vector / single:12,.1f}x')
+
+# =====================================
+# LEARNER THROUGHPUT
+# =====================================
+
+def looped_train_step(trainer, state, action, reward, next_state, done):
+    """
+    Reference copy of the original QTrainer.train_step, which runs one extra
+    forward pass per non-terminal sample. Kept only as a timing baseline.
+    """
+    state = torch.tensor(state, dtype=torch.float)
+    next_state = torch.tensor(next_state, dtype=torch.float)
+    action = torch.tensor(action, dtype=torch.long)
+    reward = torch.tensor(reward, dtype=torch.float)
+
+    pred = trainer.model(state)
+    target = pred.clone()
+    for idx in range(len(done)):
+        Q_new = reward[idx]
+        if not done[idx]:
+            Q_new = reward[idx] + trainer.gamma * torch.max(trainer.model(next_state[idx]))
+        target[idx][torch.argmax(action[idx]).item()] = Q_new
+
+    trainer.optimizer.zero_grad()
+    loss = trainer.criterion(target, pred)
+    loss.backward()
+    trainer.optimizer.step()
+
+def _random_batch(batch_size):
+    """Build a random replay batch shaped like Agent.train_long_memory's."""
+    rng = np.random.default_rng(0)
+    states = rng.integers(0, 2, size=(batch_size, 11)).astype(np.float32)
+    next_states = rng.integers(0, 2, size=(batch_size, 11)).astype(np.float32)
+    actions = np.eye(3, dtype=np.int64)[rng.integers(0, 3, size=batch_size)]
+    rewards = rng.choice([-10.0, 0.0, 10.0], size=batch_size).astype(np.float32)
+    dones = tuple(rng.random(batch_size) < 0.05)
+    return states, actions, rewards, next_states, dones
+
+def _time_calls(fn, repeats):
+    """Return the mean wall time of fn() in milliseconds."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+def bench_train_step(args):
+    """
+    Time one replay update at BATCH_SIZE samples, per-sample loop vs batched target.
+    """
+    batch = _random_batch(args.batch_size)
+    trainer = QTrainer(Linear_QNet(11, 256, 3), lr=0.001, gamma=0.9)
+    looped = _time_calls(lambda: looped_train_step(trainer, *batch), args.repeats)
+    batched = _time_calls(lambda: trainer.train_step(*batch), args.repeats)
+    print(f'looped  : {looped:10.2f} ms/update')
+    print(f'batched : {batched:10.2f} ms/update')
+    print(f'speedup : {looped / batched:10.1f}x')
+
+# =====================================
+# REPLAY MEMORY
+# =====================================
+
+def _deque_bytes(memory):
+    """Approximate heap size of a deque of (state, action, reward, next_state, done) tuples."""
+    total = sys.getsizeof(memory)
+    for transition in memory:
+        total += sys.getsizeof(transition)
+        total += sum(sys.getsizeof(field) for field in transition)
+    return total
+
+def bench_memory(args):
+    """
+    Compare the old deque-of-tuples memory with ReplayBuffer:
+    bytes per transition and time to build one training batch.
+    """
+    states, actions, rewards, next_states, dones = _random_batch(args.transitions)
+    states = states.astype(int)
+    next_states = next_states.astype(int)
+    actions = [list(a) for a in actions]
+
+    old = deque(maxlen=args.transitions)
+    new = ReplayBuffer(args.transitions, 11)
+    for transition in zip(states, actions, rewards.tolist(), next_states, dones):
+        old.append(transition)
+        new.push(*transition)
+
+    def sample_old():
+        mini_sample = random.sample(old, args.batch_size)
+        batch = zip(*mini_sample)
+        return [torch.tensor(np.array(field)) for field in batch]
+
+    old_ms = _time_calls(sample_old, args.repeats)
+    new_ms = _time_calls(lambda: new.sample(args.batch_size), args.repeats)
+    new_bytes = sum(a.nbytes for a in (new.states, new.actions, new.rewards, new.next_states, new.dones))
+    print(f'deque        : {_deque_bytes(old) / len(old):8.0f} bytes/transition {old_ms:8.2f} ms/batch')
+    print(f'ReplayBuffer : {new_bytes / len(new):8.0f} bytes/transition {new_ms:8.2f} ms/batch')
+
+# =====================================
+# SAMPLE EFFICIENCY
+# =====================================
+
+def run_training(agent, games, seed=0):
+    """
+    Run the train() loop headless, without plotting or saving, for a fixed number of games.
+
+    Args:
+        agent: Agent to train
+        games: Number of games to play
+        seed: Seed for python, NumPy and torch RNGs
+
+    Returns:
+        Tuple of (list of scores, wall time in seconds)
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    game = SnakeGameAI(headless=True)
+    scores = []
+    start = time.perf_counter()
+    while len(scores) < games:
+        state_old = agent.get_state(game)
+        final_move = agent.get_action(state_old)
+        reward, done, score = game.play_step(final_move)
+        state_new = agent.get_state(game)
+        agent.train_short_memory(state_old, final_move, reward, state_new, done)
+        agent.remember(state_old, final_move, reward, state_new, done)
+        if done:
+            game.reset()
+            agent.n_games += 1
+            agent.train_long_memory()
+            scores.append(score)
+    return scores, time.perf_counter() - start
+
+def games_to_threshold(scores, threshold, window):
+    """
+    Return the first game at which the rolling mean score reaches threshold, or None.
+    """
+    running = 0
+    for i, score in enumerate(scores):
+        running += score
+        if i >= window:
+            running -= scores[i - window]
+        if i + 1 >= window and running / window >= threshold:
+            return i + 1
+    return None
+
+def report_training(name, scores, seconds, args):
+    """Print one line of sample-efficiency results."""
+    reached = games_to_threshold(scores, args.threshold, args.window)
+    reached = 'never' if reached is None else str(reached)
+    mean_last = sum(scores[-args.window:]) / min(len(scores), args.window)
+    print(f'{name:17}: threshold at game {reached:>6}  '
+          f'last-{args.window} mean {mean_last:6.2f}  {seconds:8.1f} s')
+
+def bench_prioritized(args):
+    """
+    Games needed to reach a rolling mean score, uniform vs prioritized replay.
+    """
+    for name, prioritized in (('uniform', False), ('prioritized', True)):
+        for seed in range(args.seeds):
+            scores, seconds = run_training(Agent(prioritized=prioritized), args.games, seed)
+            report_training(f'{name}[{seed}]', scores, seconds, args)
+
+def bench_target(args):
+    """
+    Games needed to reach a rolling mean score and wall time: bootstrapping
+    from the online network against target networks and Double DQN.
+    """
+    learners = (
+        ('online', {}),
+        ('target-hard', {'target_sync': args.target_sync}),
+        ('target-polyak', {'tau': args.tau}),
+        ('double-hard', {'target_sync': args.target_sync, 'double': True}),
+        ('double-polyak', {'tau': args.tau, 'double': True}),
+    )
+    for name, options in learners:
+        for seed in range(args.seeds):
+            scores, seconds = run_training(Agent(**options), args.games, seed)
+            report_training(f'{name}[{seed}]', scores, seconds, args)
+
+# =====================================
+# OBSERVATION COST
+# =====================================
+
+def _states_per_second(game, observe, steps):
+    """Observations per second of observe(game) along a random-action game."""
+    elapsed = 0.0
+    for _ in range(steps):
+        _, done, _ = game.play_step(_random_action())
+        if done:
+            game.reset()
+        start = time.perf_counter()
+        observe(game)
+        elapsed += time.perf_counter() - start
+    return steps / elapsed
+
+def bench_observation(args):
+    """
+    Cost of building one observation: the 11 features, the occupancy grid of a
+    single game, and the grids of a whole vectorized batch written into one buffer.
+    """
+    game = SnakeGameAI(headless=True)
+    features = Agent()
+    out = np.empty(grid_shape(), dtype=np.uint8)
+    print(f'features      : {_states_per_second(game, features.get_state, args.steps):12,.0f} states/s')
+    print(f'grid          : {_states_per_second(game, lambda g: grid_observation(g, out), args.steps):12,.0f} states/s')
+
+    env = VectorSnakeEnv(args.envs, seed=0)
+    batch = np.empty((args.envs, *grid_shape()), dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    rounds = max(1, args.steps // args.envs)
+    elapsed = 0.0
+    for _ in range(rounds):
+        env.step(rng.integers(0, 3, size=args.envs))
+        start = time.perf_counter()
+        vector_grid_observation(env, batch)
+        elapsed += time.perf_counter() - start
+    print(f'grid (vector) : {rounds * args.envs / elapsed:12,.0f} states/s')
+
+# =====================================
+# ACTION SELECTION AND SHORT-MEMORY UPDATES
+# =====================================
+
+def _learning_steps(agent, games, steps):
+    """
+    Steps per second of the on-policy part of training (act, step, short-memory
+    update, store) over a list of headless games; one game uses get_action as
+    train() does, several use one get_actions call per step as train_batched() does.
+    """
+    n = len(games)
+    states = np.stack([agent.get_state(game) for game in games])
+    next_states = np.empty_like(states)
+    rewards = np.empty(n, dtype=np.float32)
+    dones = np.empty(n, dtype=np.bool_)
+    start = time.perf_counter()
+    for _ in range(steps // n):
+        if n == 1:
+            actions = [agent.get_action(states[0]).index(1)]
+        else:
+            actions = agent.get_actions(states)
+        for i, game in enumerate(games):
+            rewards[i], dones[i], _ = game.play_step(MOVES[actions[i]])
+            next_states[i] = agent.get_state(game)
+        if n == 1:
+            agent.train_short_memory(states[0], MOVES[actions[0]], rewards[0], next_states[0], dones[0])
+        else:
+            agent.train_short_memory(states.copy(), actions, rewards.copy(), next_states.copy(), dones.copy())
+        agent.memory.extend(states, actions, rewards, next_states, dones)
+        states, next_states = next_states, states
+        for i in np.flatnonzero(dones):
+            games[i].reset()
+            states[i] = agent.get_state(games[i])
+    return steps // n * n / (time.perf_counter() - start)
+
+def bench_actions(args):
+    """
+    Action selection cost per state, one get_action call per state vs one
+    get_actions call per batch, and training steps/s with per-step updates
+    against batched games with a short-memory update every K steps.
+    """
+    agent = Agent()
+    agent.n_games = 100 # past the exploration phase: every action uses the network
+    game = SnakeGameAI(headless=True)
+    states = np.stack([agent.get_state(game)] * args.action_envs)
+    single = _time_calls(lambda: [agent.get_action(state) for state in states], args.repeats)
+    batched = _time_calls(lambda: agent.get_actions(states), args.repeats)
+    print(f'get_action  : {single * 1000 / args.action_envs:10.2f} us/state')
+    print(f'get_actions : {batched * 1000 / args.action_envs:10.2f} us/state')
+
+    setups = (
+        ('per-step', 1, 1),
+        (f'{args.action_envs} envs', args.action_envs, 1),
+        (f'{args.action_envs} envs K={args.short_every}', args.action_envs, args.short_every),
+    )
+    for name, envs, short_every in setups:
+        agent = Agent(short_every=short_every)
+        agent.n_games = 100
+        games = [SnakeGameAI(headless=True) for _ in range(envs)]
+        rate = _learning_steps(agent, games, args.steps // 10)
+        print(f'{name:17}: {rate:10,.0f} steps/s')
+
+# =====================================
+# FEATURE EXTRACTION
+# =====================================
+
+def _seconds_per_million(extract, n_states, rounds):
+    """Seconds per million states of extract(), which builds n_states states per call."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        extract()
+    return (time.perf_counter() - start) / (rounds * n_states) * 1e6
+
+def _load_env_game(env, i, game):
+    """
+    Copy game i of a VectorSnakeEnv (body, direction, food) into a SnakeGameAI,
+    so Agent.get_state can be computed for it.
+    """
+    cells = env.body[i, (env.head_ptr[i] - np.arange(env.length[i])) % env.n_cells]
+    points = [Point(int(cell % env.cols) * BLOCK_SIZE, int(cell // env.cols) * BLOCK_SIZE)
+              for cell in cells]
+    game.snake.reset(points)
+    game.head = points[0]
+    game.direction = sorted(CLOCKWISE, key=CLOCKWISE.get)[env.direction[i]]
+    game.food = Point(int(env.food_x[i]) * BLOCK_SIZE, int(env.food_y[i]) * BLOCK_SIZE)
+
+def check_features(agent, states):
+    """
+    Assert that game_features and vector_features give exactly the states of
+    Agent.get_state, over random-play positions including finished games
+    whose head left the board.
+
+    Args:
+        agent: Agent providing the reference get_state
+        states: Number of states to compare for each extractor
+
+    Returns:
+        Number of states compared
+    """
+    games = [SnakeGameAI(headless=True) for _ in range(64)]
+    checked = 0
+    while checked < states:
+        finished = []
+        for game in games:
+            _, done, _ = game.play_step(_random_action())
+            if done:
+                finished.append(game)
+        expected = np.stack([agent.get_state(game) for game in games])
+        assert np.array_equal(game_features(games), expected), 'game_features differs from get_state'
+        for game in finished:
+            game.reset()
+        checked += len(games)
+
+    env = VectorSnakeEnv(64, seed=0)
+    game = SnakeGameAI(headless=True)
+    rng = np.random.default_rng(0)
+    checked = 0
+    while checked < states:
+        env.step(rng.integers(0, 3, size=env.n_envs))
+        features = vector_features(env)
+        for i in range(env.n_envs):
+            _load_env_game(env, i, game)
+            assert np.array_equal(features[i], agent.get_state(game)), 'vector_features differs from get_state'
+        checked += env.n_envs
+    return checked
+
+def bench_features(args):
+    """
+    Seconds per million 11-feature states: Agent.get_state game by game,
+    game_features over a list of games, and vector_features over a
+    VectorSnakeEnv, the last two writing into a preallocated buffer.
+    Checks first that both batched extractors match get_state exactly.
+    """
+    agent = Agent()
+    checked = check_features(agent, args.check_states)
+    print(f'identical       : {checked:,} states per extractor')
+    games = [SnakeGameAI(headless=True) for _ in range(args.action_envs)]
+    # spread the games over different positions and snake lengths
+    for game in games:
+        for _ in range(random.randint(0, 200)):
+            _, done, _ = game.play_step(_random_action())
+            if done:
+                game.reset()
+    out = np.empty((len(games), FEATURES), dtype=np.float32)
+    rounds = max(1, args.steps // len(games))
+    per_game = _seconds_per_million(lambda: [agent.get_state(game) for game in games], len(games), rounds)
+    batched = _seconds_per_million(lambda: game_features(games, out), len(games), rounds)
+
+    env = VectorSnakeEnv(args.envs, seed=0)
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        env.step(rng.integers(0, 3, size=args.envs))
+    env_out = np.empty((args.envs, FEATURES), dtype=np.float32)
+    vector = _seconds_per_million(lambda: vector_features(env, env_out), args.envs,
+                                  max(1, args.steps // args.envs))
+    print(f'get_state       : {per_game:8.2f} s per million states')
+    print(f'game_features   : {batched:8.2f} s per million states ({len(games)} games, {per_game / batched:.1f}x)')
+    print(f'vector_features : {vector:8.2f} s per million states ({args.envs} envs, {per_game / vector:.0f}x)')
+
+# =====================================
+# SCRIPT EXECUTION
+# =====================================
+
+BENCHMARKS = {
+    'headless': bench_headless,
+    'vector': bench_vector,
+    'train-step': bench_train_step,
+    'memory': bench_memory,
+    'prioritized': bench_prioritized,
+    'target': bench_target,
+    'observation': bench_observation,
+    'actions': bench_actions,
+    'features': bench_features,
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Snake AI performance benchmarks.')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--steps', type=int, default=50_000,
+                        help='steps timed for the fast configuration')
+    parser.add_argument('--render-steps', type=int, default=200,
+                        help='steps timed for the frame-limited configuration')
+    parser.add_argument('--envs', type=int, default=1024,
+                        help='number of games in the vectorized environment')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='replay batch size for learner benchmarks')
+    parser.add_argument('--repeats', type=int, default=20,
+                        help='timed repetitions for learner benchmarks')
+    parser.add_argument('--transitions', type=int, default=100_000,
+                        help='transitions stored for memory benchmarks')
+    parser.add_argument('--games', type=int, default=300,
+                        help='games played per training run')
+    parser.add_argument('--seeds', type=int, default=3,
+                        help='training runs per configuration')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='rolling mean score that counts as learned')
+    parser.add_argument('--window', type=int, default=20,
+                        help='games in the rolling mean')
+    parser.add_argument('--target-sync', type=int, default=500,
+                        help='train steps between hard target updates')
+    parser.add_argument('--tau', type=float, default=0.005,
+                        help='Polyak factor of soft target updates')
+    parser.add_argument('--action-envs', type=int, default=64,
+                        help='games stepped together in the actions benchmark')
+    parser.add_argument('--short-every', type=int, default=8,
+                        help='steps per short-memory update in the actions benchmark')
+    parser.add_argument('--check-states', type=int, default=20_000,
+                        help='random states compared against the reference in correctness checks')
+    parser.add_argument('--skip-render', action='store_true',
+                        help='do not open a window')
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
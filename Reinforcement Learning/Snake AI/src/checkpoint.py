@@ -0,0 +1,91 @@
+
+# =====================================
+# TRAINING CHECKPOINTS
+# =====================================
+# Saves and restores everything needed to continue a training run: model,
+# target network and optimizer state, game counter (which drives the epsilon
+# schedule), running statistics, RNG states and optionally the replay memory.
+# Checkpoints are written to a temporary file and renamed into place, so a run
+# killed mid-save never leaves a truncated checkpoint behind.
+
+import os
+import random
+import numpy as np
+import torch
+
+CHECKPOINT_PATH = './model/checkpoint.pth'
+
+# =====================================
+# SAVE AND LOAD
+# =====================================
+
+def save_checkpoint(agent, stats, path=CHECKPOINT_PATH, include_memory=True):
+    """
+    Atomically write a training checkpoint.
+
+    Args:
+        agent: Agent being trained
+        stats: Dict of running statistics to restore (e.g. record, total_score)
+        path: Checkpoint file
+        include_memory: Also store the replay memory so warm-up is not repeated
+    """
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+
+    checkpoint = {
+        'model': agent.model.state_dict(),
+        'optimizer': agent.trainer.optimizer.state_dict(),
+        'target_model': (agent.trainer.target_model.state_dict()
+                         if agent.trainer.target_model is not None else None),
+        'train_steps': agent.trainer.steps,
+        'n_games': agent.n_games,
+        'epsilon': agent.epsilon,
+        'stats': dict(stats),
+        'rng': {
+            'python': random.getstate(),
+            'numpy': np.random.get_state(),
+            'torch': torch.get_rng_state(),
+        },
+        'memory': agent.memory.state_dict() if include_memory else None,
+    }
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        torch.save(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def load_checkpoint(agent, path=CHECKPOINT_PATH):
+    """
+    Restore an agent and the RNGs from a checkpoint.
+
+    Args:
+        agent: Freshly constructed Agent to load into
+        path: Checkpoint file
+
+    Returns:
+        Dict of running statistics saved with the checkpoint
+    """
+    # the checkpoint holds RNG states and NumPy arrays, not only tensors
+    checkpoint = torch.load(path, weights_only=False)
+
+    agent.model.load_state_dict(checkpoint['model'])
+    agent.trainer.optimizer.load_state_dict(checkpoint['optimizer'])
+    agent.trainer.steps = checkpoint.get('train_steps', 0)
+    if agent.trainer.target_model is not None:
+        # older checkpoints and runs without a target network: start it from the online weights
+        if checkpoint.get('target_model') is not None:
+            agent.trainer.target_model.load_state_dict(checkpoint['target_model'])
+        else:
+            agent.trainer.sync_target()
+    agent.n_games = checkpoint['n_games']
+    agent.epsilon = checkpoint['epsilon']
+    if checkpoint['memory'] is not None:
+        agent.memory.load_state_dict(checkpoint['memory'])
+
+    random.setstate(checkpoint['rng']['python'])
+    np.random.set_state(checkpoint['rng']['numpy'])
+    torch.set_rng_state(checkpoint['rng']['torch'])
+    return checkpoint['stats']
@@ -6,14 +6,13 @@
 # Provides state observation, action execution, and reward feedback for AI agents
 
 import pygame
-import random
 from enum import Enum
 from collections import namedtuple
+from snake_body import SnakeBody
 import numpy as np
 
-# Initialize pygame and font
-pygame.init()
-font = pygame.font.Font('arial.ttf', 25)
+# Font is loaded lazily so headless environments never initialise pygame
+font = None
 #font = pygame.font.SysFont('arial', 25)
 
 # =====================================
@@ -51,21 +50,43 @@ class SnakeGameAI:
     Provides standard RL interface with states, actions, and rewards.
     """
 
-    def __init__(self, w=640, h=480):
+    def __init__(self, w=640, h=480, headless=False, render_every=0, render_callback=None):
         """
         Initialize the game environment.
         
         Args:
             w: Window width in pixels
             h: Window height in pixels
+            headless: Skip the pygame window, font and frame limiter entirely
+            render_every: In headless mode, draw every N-th episode at normal speed (0 never draws)
+            render_callback: Optional callable invoked as render_callback(game) after every step,
+                including the one that ends the game
         """
         self.w = w
         self.h = h
+        self.headless = headless
+        self.render_every = render_every
+        self.render_callback = render_callback
+        self.display = None
+        self.episode = 0
+        self.snake = SnakeBody(self.w, self.h, BLOCK_SIZE)
         # init display
+        if not self.headless:
+            self._init_display()
+        self.reset()
+
+    def _init_display(self):
+        """
+        Open the game window and load the score font.
+        Only called when a frame actually has to be drawn.
+        """
+        global font
+        pygame.init()
+        if font is None:
+            font = pygame.font.Font('arial.ttf', 25)
         self.display = pygame.display.set_mode((self.w, self.h))
         pygame.display.set_caption('Snake')
         self.clock = pygame.time.Clock()
-        self.reset()
 
     # =====================================
     # GAME STATE MANAGEMENT
@@ -76,13 +97,20 @@ class SnakeGameAI:
         Reset the game to initial state.
         Called at the start of each episode.
         """
+        # decide whether this episode is drawn
+        self.episode += 1
+        self.rendering = not self.headless or (
+            self.render_every > 0 and self.episode % self.render_every == 0)
+        if self.rendering and self.display is None:
+            self._init_display()
+
         # init game state
         self.direction = Direction.RIGHT
 
         self.head = Point(self.w/2, self.h/2)
-        self.snake = [self.head,
-                      Point(self.head.x-BLOCK_SIZE, self.head.y),
-                      Point(self.head.x-(2*BLOCK_SIZE), self.head.y)]
+        self.snake.reset([self.head,
+                          Point(self.head.x-BLOCK_SIZE, self.head.y),
+                          Point(self.head.x-(2*BLOCK_SIZE), self.head.y)])
 
         self.score = 0
         self.food = None
@@ -91,14 +119,16 @@ class SnakeGameAI:
 
     def _place_food(self):
         """
-        Randomly place food on the game board.
-        Ensures food doesn't spawn on snake body.
+        Place food on a random free cell of the game board in constant time.
+
+        Returns:
+            False if the snake fills the whole board, so no food can be placed
         """
-        x = random.randint(0, (self.w-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE
-        y = random.randint(0, (self.h-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE
-        self.food = Point(x, y)
-        if self.food in self.snake:
-            self._place_food()
+        food = self.snake.random_free_cell(Point)
+        if food is None:
+            return False
+        self.food = food
+        return True
 
     # =====================================
     # MAIN GAME LOOP
@@ -115,15 +145,16 @@ class SnakeGameAI:
             Tuple of (reward, game_over, score)
         """
         self.frame_iteration += 1
-        # 1. collect user input
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
+        # 1. collect user input (only when a window exists)
+        if self.display is not None:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    quit()
         
         # 2. move
         self._move(action) # update the head
-        self.snake.insert(0, self.head)
+        self.snake.push_head(self.head)
         
         # 3. check if game over
         reward = 0
@@ -131,19 +162,24 @@ class SnakeGameAI:
         if self.is_collision() or self.frame_iteration > 100*len(self.snake):
             game_over = True
             reward = -10
-            return reward, game_over, self.score
 
         # 4. place new food or just move
-        if self.head == self.food:
+        elif self.head == self.food:
             self.score += 1
             reward = 10
-            self._place_food()
+            if not self._place_food():
+                # snake fills the board: the game is won, food stays under the head
+                game_over = True
         else:
-            self.snake.pop()
+            self.snake.pop_tail()
         
-        # 5. update ui and clock
-        self._update_ui()
-        self.clock.tick(SPEED)
+        # 5. update ui and clock (headless episodes run unthrottled); the
+        # final frame is not drawn, but the callback sees every step
+        if self.rendering and not game_over:
+            self._update_ui()
+            self.clock.tick(SPEED)
+        if self.render_callback is not None:
+            self.render_callback(self)
         # 6. return game over and score
         return reward, game_over, self.score
 
@@ -167,7 +203,7 @@ class SnakeGameAI:
         if pt.x > self.w - BLOCK_SIZE or pt.x < 0 or pt.y > self.h - BLOCK_SIZE or pt.y < 0:
             return True
         # hits itself
-        if pt in self.snake[1:]:
+        if self.snake.hits(pt):
             return True
 
         return False
@@ -2,42 +2,155 @@
 # =====================================
 # VISUALIZATION HELPER FOR TRAINING PROGRESS
 # =====================================
-# Provides real-time plotting functionality to track agent performance during training
+# Training appends one line per game to a CSV metrics log, which costs O(1) and
+# never blocks. An optional viewer process tails that log and redraws the plot
+# at its own rate, so plotting never slows the learner down.
+#
+# Usage (viewer on its own, e.g. for a run on another machine):
+#   python helper.py ./model/metrics.csv
 
-import matplotlib.pyplot as plt
-from IPython import display
+import multiprocessing
+import os
+import sys
 
-# Enable interactive plotting mode
-plt.ion()
+METRICS_PATH = './model/metrics.csv'
+HEADER = 'game,score,mean_score,record\n'
 
-def plot(scores, mean_scores):
+# =====================================
+# METRICS LOG
+# =====================================
+
+class MetricsLogger:
+    """
+    Append-only CSV log of per-game training metrics.
+    """
+
+    def __init__(self, path=METRICS_PATH, append=False):
+        """
+        Open the log file.
+
+        Args:
+            path: CSV file to write
+            append: Keep existing rows (e.g. when resuming) instead of starting a new log
+        """
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        new_file = not append or not os.path.exists(path)
+        self._file = open(path, 'w' if new_file else 'a', buffering=1)
+        if new_file:
+            self._file.write(HEADER)
+
+    def log(self, game, score, mean_score, record):
+        """
+        Append one game's metrics.
+
+        Args:
+            game: Game number
+            score: Score of that game
+            mean_score: Running mean score
+            record: Best score so far
+        """
+        self._file.write(f'{game},{score},{mean_score:.4f},{record}\n')
+
+    def close(self):
+        """Close the log file."""
+        self._file.close()
+
+# =====================================
+# VIEWER
+# =====================================
+
+class _Downsampler:
     """
-    Create and update a real-time plot showing training progress.
-    Displays both individual game scores and running mean scores.
-    
+    Keeps at most max_points evenly spaced samples of a growing series.
+    When full, every other sample is dropped and the stride doubles, so
+    adding a point is amortised O(1).
+    """
+
+    def __init__(self, max_points):
+        self.max_points = max_points
+        self.stride = 1
+        self.seen = 0
+        self.x, self.scores, self.means = [], [], []
+
+    def add(self, game, score, mean_score):
+        if self.seen % self.stride == 0:
+            self.x.append(game)
+            self.scores.append(score)
+            self.means.append(mean_score)
+            if len(self.x) > self.max_points:
+                self.x, self.scores, self.means = self.x[::2], self.scores[::2], self.means[::2]
+                self.stride *= 2
+        self.seen += 1
+
+def view(path=METRICS_PATH, interval=1.0, max_points=2000):
+    """
+    Tail a metrics log and redraw the training plot every interval seconds.
+    Only rows appended since the last redraw are read, and the existing line
+    objects are updated in place.
+
     Args:
-        scores: List of scores from individual games
-        mean_scores: List of running mean scores
-    """
-    # Clear previous output and display current plot
-    display.clear_output(wait=True)
-    display.display(plt.gcf())
-    plt.clf()
-    
-    # Set up plot appearance
-    plt.title('Training...')
-    plt.xlabel('Number of Games')
-    plt.ylabel('Score')
-    
-    # Plot both score lines
-    plt.plot(scores)
-    plt.plot(mean_scores)
-    plt.ylim(ymin=0)
-    
-    # Add text labels showing latest values
-    plt.text(len(scores)-1, scores[-1], str(scores[-1]))
-    plt.text(len(mean_scores)-1, mean_scores[-1], str(mean_scores[-1]))
-    
-    # Display plot without blocking execution
-    plt.show(block=False)
-    plt.pause(.1)
\ No newline at end of file
+        path: CSV file written by MetricsLogger
+        interval: Seconds between redraws
+        max_points: Maximum points drawn per line
+    """
+    import matplotlib.pyplot as plt
+
+    plt.ion()
+    fig, ax = plt.subplots()
+    ax.set_title('Training...')
+    ax.set_xlabel('Number of Games')
+    ax.set_ylabel('Score')
+    score_line, = ax.plot([], [])
+    mean_line, = ax.plot([], [])
+    label = ax.text(0, 0, '')
+
+    data = _Downsampler(max_points)
+    offset = 0
+    partial = ''
+    while plt.fignum_exists(fig.number):
+        if os.path.exists(path):
+            with open(path) as f:
+                if os.path.getsize(path) < offset:
+                    # log was restarted
+                    data, offset, partial = _Downsampler(max_points), 0, ''
+                f.seek(offset)
+                chunk = f.read()
+                offset = f.tell()
+            lines = (partial + chunk).split('\n')
+            partial = lines.pop()
+            for line in lines:
+                if not line or line == HEADER.strip():
+                    continue
+                game, score, mean_score, _ = line.split(',')
+                data.add(int(game), int(score), float(mean_score))
+
+        if data.x:
+            score_line.set_data(data.x, data.scores)
+            mean_line.set_data(data.x, data.means)
+            label.set_position((data.x[-1], data.means[-1]))
+            label.set_text(f'{data.means[-1]:.2f}')
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_ylim(bottom=0)
+        plt.pause(interval)
+
+def start_viewer(path=METRICS_PATH, interval=1.0):
+    """
+    Launch the viewer in a separate daemon process.
+
+    Args:
+        path: CSV file written by MetricsLogger
+        interval: Seconds between redraws
+
+    Returns:
+        The started multiprocessing.Process
+    """
+    process = multiprocessing.Process(target=view, args=(path, interval), daemon=True)
+    process.start()
+    return process
+
+if __name__ == '__main__':
+    view(sys.argv[1] if len(sys.argv) > 1 else METRICS_PATH)
@@ -0,0 +1,330 @@
+
+# =====================================
+# EXPERIENCE REPLAY MEMORY
+# =====================================
+# Fixed-size replay buffers backed by preallocated NumPy arrays.
+# Transitions are written in place into a ring and sampled as torch tensors
+# that share memory with the sampling buffers.
+
+import numpy as np
+import torch
+
+# =====================================
+# UNIFORM REPLAY BUFFER
+# =====================================
+
+class ReplayBuffer:
+    """
+    Ring buffer of (state, action, reward, next_state, done) transitions.
+    Once full, the oldest transitions are overwritten first.
+    """
+
+    def __init__(self, capacity, state_shape, state_dtype=np.float32):
+        """
+        Preallocate storage for all transitions.
+
+        Args:
+            capacity: Maximum number of transitions kept
+            state_shape: Shape of a single state (int or tuple)
+            state_dtype: NumPy dtype used to store states
+        """
+        if isinstance(state_shape, int):
+            state_shape = (state_shape,)
+        self.capacity = capacity
+        self.state_shape = tuple(state_shape)
+        self.states = np.zeros((capacity, *self.state_shape), dtype=state_dtype)
+        self.next_states = np.zeros((capacity, *self.state_shape), dtype=state_dtype)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.ptr = 0
+        self.size = 0
+        self._batch = None
+
+    def __len__(self):
+        return self.size
+
+    def push(self, state, action, reward, next_state, done):
+        """
+        Store one transition, overwriting the oldest one when full.
+
+        Args:
+            state: Current state
+            action: One-hot action [straight, right, left] or action index
+            reward: Reward received
+            next_state: Resulting state
+            done: Whether episode ended
+        """
+        i = self.ptr
+        self.states[i] = state
+        self.next_states[i] = next_state
+        self.actions[i] = action if np.ndim(action) == 0 else np.argmax(action)
+        self.rewards[i] = reward
+        self.dones[i] = done
+        self.ptr = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        """
+        Store a batch of transitions (e.g. a whole episode) in one write.
+
+        Args:
+            states: (n, *state_shape) array of states
+            actions: (n,) action indices or (n, 3) one-hot actions
+            rewards: (n,) rewards
+            next_states: (n, *state_shape) array of resulting states
+            dones: (n,) episode-ended flags
+
+        Returns:
+            Integer array of the buffer positions written
+        """
+        actions = np.asarray(actions)
+        if actions.ndim == 2:
+            actions = np.argmax(actions, axis=1)
+        n = len(actions)
+        idx = (self.ptr + np.arange(n)) % self.capacity
+        self.states[idx] = states
+        self.next_states[idx] = next_states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.dones[idx] = dones
+        self.ptr = (self.ptr + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        return idx
+
+    def state_dict(self):
+        """
+        Return the stored transitions and ring position, e.g. for checkpoints.
+        """
+        n = self.size
+        return {
+            'ptr': self.ptr,
+            'size': n,
+            'states': self.states[:n].copy(),
+            'actions': self.actions[:n].copy(),
+            'rewards': self.rewards[:n].copy(),
+            'next_states': self.next_states[:n].copy(),
+            'dones': self.dones[:n].copy(),
+        }
+
+    def load_state_dict(self, state):
+        """
+        Restore transitions saved by state_dict into the preallocated arrays.
+
+        Args:
+            state: Dict returned by state_dict
+        """
+        n = state['size']
+        if n > self.capacity:
+            raise ValueError(f'checkpoint holds {n} transitions, buffer capacity is {self.capacity}')
+        self.states[:n] = state['states']
+        self.actions[:n] = state['actions']
+        self.rewards[:n] = state['rewards']
+        self.next_states[:n] = state['next_states']
+        self.dones[:n] = state['dones']
+        self.ptr = state['ptr'] % self.capacity
+        self.size = n
+
+    def _batch_buffers(self, batch_size):
+        """Return reusable output arrays for a batch of the given size."""
+        if self._batch is None or len(self._batch[0]) != batch_size:
+            self._batch = (
+                np.empty((batch_size, *self.state_shape), dtype=self.states.dtype),
+                np.empty(batch_size, dtype=np.int64),
+                np.empty(batch_size, dtype=np.float32),
+                np.empty((batch_size, *self.state_shape), dtype=self.states.dtype),
+                np.empty(batch_size, dtype=np.bool_),
+            )
+        return self._batch
+
+    def gather(self, idx):
+        """
+        Copy the transitions at the given indices into the batch buffers.
+
+        Args:
+            idx: Integer array of buffer positions
+
+        Returns:
+            Tuple of (states, actions, rewards, next_states, dones) tensors.
+            They share memory with the batch buffers and are overwritten by the next call.
+        """
+        out = self._batch_buffers(len(idx))
+        sources = (self.states, self.actions, self.rewards, self.next_states, self.dones)
+        for source, dest in zip(sources, out):
+            np.take(source, idx, axis=0, out=dest)
+        return tuple(torch.from_numpy(a) for a in out)
+
+    def sample(self, batch_size):
+        """
+        Draw a batch of transitions uniformly at random (with replacement).
+        When the buffer holds no more than batch_size transitions, all of them
+        are returned, as the original deque-based memory did.
+
+        Args:
+            batch_size: Number of transitions to draw
+
+        Returns:
+            Tuple of (states, actions, rewards, next_states, dones) tensors
+        """
+        if self.size <= batch_size:
+            arrays = (self.states, self.actions, self.rewards, self.next_states, self.dones)
+            return tuple(torch.from_numpy(a[:self.size]) for a in arrays)
+        return self.gather(np.random.randint(0, self.size, size=batch_size))
+
+# =====================================
+# PRIORITIZED REPLAY
+# =====================================
+
+class SumTree:
+    """
+    Binary tree whose leaves hold priorities and whose inner nodes hold the sum
+    of their children. Supports O(log n) proportional sampling and updates,
+    vectorized over a batch of indices.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity: Number of leaves (rounded up to a power of two internally)
+        """
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.capacity = capacity
+        self._leaves = size
+        self.tree = np.zeros(2 * size, dtype=np.float64) # root at index 1
+
+    def total(self):
+        """Sum of all priorities."""
+        return self.tree[1]
+
+    def get(self, idx):
+        """Priorities stored at the given leaf indices."""
+        return self.tree[np.asarray(idx) + self._leaves]
+
+    def update(self, idx, priorities):
+        """
+        Set leaf priorities and refresh the sums on the path to the root.
+
+        Args:
+            idx: Integer array of leaf indices
+            priorities: Array of new priorities
+        """
+        pos = np.asarray(idx) + self._leaves
+        if pos.size == 0:
+            return
+        self.tree[pos] = priorities
+        # all leaves sit on the same level, so every step moves one level up
+        while pos[0] > 1:
+            pos = np.unique(pos // 2)
+            self.tree[pos] = self.tree[2 * pos] + self.tree[2 * pos + 1]
+
+    def find(self, values):
+        """
+        Descend from the root to the leaves holding the given prefix sums.
+
+        Args:
+            values: Array of values in [0, total())
+
+        Returns:
+            Integer array of leaf indices
+        """
+        values = np.array(values, dtype=np.float64)
+        pos = np.ones(len(values), dtype=np.int64)
+        while pos[0] < self._leaves:
+            left = 2 * pos
+            go_right = values >= self.tree[left]
+            values = np.where(go_right, values - self.tree[left], values)
+            pos = left + go_right
+        return np.minimum(pos - self._leaves, self.capacity - 1)
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer that samples transitions in proportion to their TD error
+    and returns importance-sampling weights to correct for the bias.
+    """
+
+    def __init__(self, capacity, state_shape, state_dtype=np.float32,
+                 alpha=0.6, beta=0.4, beta_increment=1e-4, eps=1e-5):
+        """
+        Args:
+            capacity: Maximum number of transitions kept
+            state_shape: Shape of a single state (int or tuple)
+            state_dtype: NumPy dtype used to store states
+            alpha: How strongly priorities skew sampling (0 = uniform)
+            beta: Initial importance-sampling exponent, annealed towards 1
+            beta_increment: Amount beta grows after every sample call
+            eps: Small constant so no transition gets zero priority
+        """
+        super().__init__(capacity, state_shape, state_dtype)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.eps = eps
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def push(self, state, action, reward, next_state, done):
+        """Store one transition with the highest priority seen so far."""
+        self.tree.update([self.ptr], [self.max_priority])
+        super().push(state, action, reward, next_state, done)
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        """Store a batch of transitions, all with the highest priority seen so far."""
+        idx = super().extend(states, actions, rewards, next_states, dones)
+        self.tree.update(idx, np.full(len(idx), self.max_priority))
+        return idx
+
+    def state_dict(self):
+        """Return the stored transitions plus the priority tree and annealing state."""
+        state = super().state_dict()
+        state['priorities'] = self.tree.get(np.arange(self.size))
+        state['max_priority'] = self.max_priority
+        state['beta'] = self.beta
+        return state
+
+    def load_state_dict(self, state):
+        """Restore transitions and priorities saved by state_dict."""
+        super().load_state_dict(state)
+        if 'priorities' in state:
+            self.tree.update(np.arange(self.size), state['priorities'])
+            self.max_priority = state['max_priority']
+            self.beta = state['beta']
+        else:
+            # checkpoint from a uniform buffer: start every transition at priority 1
+            self.tree.update(np.arange(self.size), np.ones(self.size))
+
+    def sample(self, batch_size):
+        """
+        Draw a batch proportionally to priority using stratified prefix sums.
+
+        Args:
+            batch_size: Number of transitions to draw
+
+        Returns:
+            Tuple of (states, actions, rewards, next_states, dones, weights, indices).
+            weights is a float tensor of importance-sampling weights normalised to max 1,
+            indices must be passed back to update_priorities.
+        """
+        total = self.tree.total()
+        segment = total / batch_size
+        values = (np.arange(batch_size) + np.random.random(batch_size)) * segment
+        idx = np.minimum(self.tree.find(values), self.size - 1)
+
+        probs = self.tree.get(idx) / total
+        weights = (self.size * probs) ** -self.beta
+        weights = torch.from_numpy((weights / weights.max()).astype(np.float32))
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return (*self.gather(idx), weights, idx)
+
+    def update_priorities(self, idx, td_errors):
+        """
+        Write new priorities for sampled transitions from their TD errors.
+
+        Args:
+            idx: Indices returned by sample
+            td_errors: Array of TD errors for those transitions
+        """
+        priorities = (np.abs(td_errors) + self.eps) ** self.alpha
+        self.tree.update(idx, priorities)
+        self.max_priority = max(self.max_priority, priorities.max())
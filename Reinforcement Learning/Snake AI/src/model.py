@@ -8,13 +8,43 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
+import numpy as np
+import copy
 import os
 
+def _to_tensor(data, dtype):
+    """
+    Convert a replay batch field to a tensor of the given dtype.
+    Tensors (e.g. from ReplayBuffer.sample) are used as-is without copying.
+    """
+    if isinstance(data, torch.Tensor):
+        return data.to(dtype)
+    return torch.as_tensor(np.asarray(data), dtype=dtype)
+
 # =====================================
 # Q-NETWORK ARCHITECTURE
 # =====================================
 
-class Linear_QNet(nn.Module):
+class QNet(nn.Module):
+    """
+    Base class of the Q-networks: saving to the model folder.
+    """
+
+    def save(self, file_name='model.pth'):
+        """
+        Save the trained model to disk.
+        
+        Args:
+            file_name: Name of the file to save the model
+        """
+        model_folder_path = './model'
+        if not os.path.exists(model_folder_path):
+            os.makedirs(model_folder_path)
+
+        file_name = os.path.join(model_folder_path, file_name)
+        torch.save(self.state_dict(), file_name)
+
+class Linear_QNet(QNet):
     """
     Neural network for Q-value approximation in Deep Q-Learning.
     Simple feedforward network with one hidden layer.
@@ -47,19 +77,50 @@ class Linear_QNet(nn.Module):
         x = self.linear2(x)
         return x
 
-    def save(self, file_name='model.pth'):
+class Conv_QNet(QNet):
+    """
+    Convolutional Q-network for grid observations (see observation.py).
+    Two strided convolutions shrink the board before a small fully connected head.
+    """
+
+    def __init__(self, channels, rows, cols, output_size, hidden_size=256):
         """
-        Save the trained model to disk.
-        
+        Initialize the Q-Network architecture.
+
         Args:
-            file_name: Name of the file to save the model
+            channels: Input channels of the grid observation
+            rows: Board height in cells
+            cols: Board width in cells
+            output_size: Number of possible actions
+            hidden_size: Number of neurons in the fully connected layer
         """
-        model_folder_path = './model'
-        if not os.path.exists(model_folder_path):
-            os.makedirs(model_folder_path)
+        super().__init__()
+        self.conv1 = nn.Conv2d(channels, 32, 3, padding=1)
+        self.conv2 = nn.Conv2d(32, 64, 3, stride=2, padding=1)
+        self.conv3 = nn.Conv2d(64, 64, 3, stride=2, padding=1)
+        conv_rows = (rows + 3) // 4
+        conv_cols = (cols + 3) // 4
+        self.linear1 = nn.Linear(64 * conv_rows * conv_cols, hidden_size)
+        self.linear2 = nn.Linear(hidden_size, output_size)
 
-        file_name = os.path.join(model_folder_path, file_name)
-        torch.save(self.state_dict(), file_name)
+    def forward(self, x):
+        """
+        Forward pass through the network.
+
+        Args:
+            x: Grid observation(s) of shape (channels, rows, cols) or
+                (n, channels, rows, cols), any numeric dtype
+
+        Returns:
+            Q-values for each possible action
+        """
+        x = x.float()
+        x = F.relu(self.conv1(x))
+        x = F.relu(self.conv2(x))
+        x = F.relu(self.conv3(x))
+        x = F.relu(self.linear1(x.flatten(-3)))
+        x = self.linear2(x)
+        return x
 
 # =====================================
 # Q-LEARNING TRAINER
@@ -69,9 +130,13 @@ class QTrainer:
     """
     Training component for the Q-Network using Deep Q-Learning algorithm.
     Handles loss computation, backpropagation, and parameter updates.
+    Optionally bootstraps from a frozen target network, kept in step with the
+    online network by hard copies or Polyak averaging, and can use the
+    Double-DQN target (online network picks the next action, target network
+    scores it).
     """
     
-    def __init__(self, model, lr, gamma):
+    def __init__(self, model, lr, gamma, target_sync=0, tau=0.0, double=False):
         """
         Initialize the trainer with model and hyperparameters.
         
@@ -79,60 +144,114 @@ class QTrainer:
             model: Q-Network to train
             lr: Learning rate for optimization
             gamma: Discount factor for future rewards
+            target_sync: Copy the online weights into the target network every
+                N train steps (0: no hard updates)
+            tau: Polyak factor blending the online weights into the target
+                network after every train step (0: no soft updates)
+            double: Use the Double-DQN target (needs target_sync or tau)
         """
+        if double and not (target_sync or tau):
+            raise ValueError('the Double-DQN target needs a target network: set target_sync or tau')
         self.lr = lr
         self.gamma = gamma
         self.model = model
         self.optimizer = optim.Adam(model.parameters(), lr=self.lr)
         self.criterion = nn.MSELoss()
+        self.target_sync = target_sync
+        self.tau = tau
+        self.double = double
+        self.steps = 0
+        # without hard or soft updates, bootstrap from the online network as before
+        self.target_model = None
+        if target_sync or tau:
+            self.target_model = copy.deepcopy(model)
+            self.target_model.requires_grad_(False)
 
-    def train_step(self, state, action, reward, next_state, done):
+    def sync_target(self):
+        """Copy the online network's weights into the target network."""
+        if self.target_model is not None:
+            self.target_model.load_state_dict(self.model.state_dict())
+
+    def _update_target(self):
+        """Hard or soft target update after a train step."""
+        if self.tau:
+            with torch.no_grad():
+                for target, online in zip(self.target_model.parameters(), self.model.parameters()):
+                    target.lerp_(online, self.tau)
+        if self.target_sync and self.steps % self.target_sync == 0:
+            self.sync_target()
+
+    def train_step(self, state, action, reward, next_state, done, weights=None):
         """
         Perform one training step using the Q-Learning update rule.
         
         Args:
             state: Current state(s)
-            action: Action(s) taken
+            action: Action(s) taken, one-hot or as action indices
             reward: Reward(s) received
             next_state: Next state(s) reached
             done: Whether episode(s) ended
+            weights: Optional per-sample importance-sampling weights (prioritized replay)
+
+        Returns:
+            NumPy array of TD errors (Q_new - Q(state, action)) for each sample
         """
         # Convert inputs to tensors
-        state = torch.tensor(state, dtype=torch.float)
-        next_state = torch.tensor(next_state, dtype=torch.float)
-        action = torch.tensor(action, dtype=torch.long)
-        reward = torch.tensor(reward, dtype=torch.float)
+        state = _to_tensor(state, torch.float)
+        next_state = _to_tensor(next_state, torch.float)
+        action = _to_tensor(action, torch.long)
+        reward = _to_tensor(reward, torch.float)
+        done = _to_tensor(done, torch.bool)
         # (n, x)
 
-        # Handle single experience vs batch
-        if len(state.shape) == 1:
+        # Handle single experience vs batch (a single transition has a scalar done flag)
+        if done.dim() == 0:
             # (1, x)
             state = torch.unsqueeze(state, 0)
             next_state = torch.unsqueeze(next_state, 0)
             action = torch.unsqueeze(action, 0)
             reward = torch.unsqueeze(reward, 0)
-            done = (done, )
+            done = torch.unsqueeze(done, 0)
+
+        # one-hot actions -> action indices
+        if action.dim() == 2:
+            action = torch.argmax(action, dim=1)
 
         # 1: predicted Q values with current state
         pred = self.model(state)
 
         # 2: Apply Q-Learning update rule: Q_new = reward + gamma * max(next_Q_values)
-        target = pred.clone()
-        for idx in range(len(done)):
-            Q_new = reward[idx]
-            if not done[idx]:
-                Q_new = reward[idx] + self.gamma * torch.max(self.model(next_state[idx]))
+        # one batched forward pass over all next states, masked where the episode ended
+        with torch.no_grad():
+            bootstrap = self.target_model if self.target_model is not None else self.model
+            next_values = bootstrap(next_state)
+            if self.double:
+                next_action = self.model(next_state).argmax(dim=1, keepdim=True)
+                next_q = next_values.gather(1, next_action).squeeze(1)
+            else:
+                next_q = next_values.max(dim=1)[0]
+        Q_new = reward + self.gamma * next_q * ~done
+
+        # preds[argmax(action)] = Q_new, scattered for the whole batch
+        batch = torch.arange(len(done))
+        target = pred.detach().clone()
+        target[batch, action] = Q_new
+        td_error = Q_new - pred.detach()[batch, action]
 
-            target[idx][torch.argmax(action[idx]).item()] = Q_new
-    
-        # 2: Q_new = r + y * max(next_predicted Q value) -> only do this if not done
-        # pred.clone()
-        # preds[argmax(action)] = Q_new
-        
         # Perform gradient descent step
         self.optimizer.zero_grad()
-        loss = self.criterion(target, pred)
+        if weights is None:
+            loss = self.criterion(target, pred)
+        else:
+            weights = _to_tensor(weights, torch.float)
+            loss = (weights.unsqueeze(1) * (pred - target) ** 2).mean()
         loss.backward()
         self.optimizer.step()
 
+        self.steps += 1
+        if self.target_model is not None:
+            self._update_target()
+
+        return td_error.numpy()
+
 
@@ -0,0 +1,178 @@
+
+# =====================================
+# OBSERVATIONS FOR MANY GAMES
+# =====================================
+# Builds agent inputs with array operations instead of per-game Python code:
+# - the 11 danger/direction/food features of Agent.get_state for a whole batch
+#   of games, bit-identical to calling get_state on each of them,
+# - multi-channel occupancy grids, an alternative to the 11 features that lets
+#   the network see the whole body.
+#
+# Feature order (as in Agent.get_state):
+#   0-2  danger straight, right, left
+#   3-6  moving left, right, up, down
+#   7-10 food left, right, up, down
+#
+# Grid channels (rows x cols, uint8):
+#   0 body   1 on every cell covered by the snake (head included)
+#   1 head   1 on the head cell
+#   2 food   1 on the food cell
+#   3 neck   1 on the segment behind the head; with the head it gives the direction
+#
+# The body channel is read straight from the environment's own occupancy grid
+# (SnakeBody.grid or VectorSnakeEnv.grid) through a NumPy view, without
+# building any Python objects; the other channels are a few single-cell writes.
+
+import numpy as np
+from game import BLOCK_SIZE, Direction
+from vector_env import DX, DY, TURN
+
+FEATURES = 11
+# Clockwise index (as used by VectorSnakeEnv) of each Direction
+CLOCKWISE = {Direction.RIGHT: 0, Direction.DOWN: 1, Direction.LEFT: 2, Direction.UP: 3}
+# Clockwise index behind each of the direction features: left, right, up, down
+DIRECTION_ORDER = np.array([2, 0, 3, 1], dtype=np.int64)
+
+GRID_CHANNELS = 4
+BODY, HEAD, FOOD, NECK = range(GRID_CHANNELS)
+
+# =====================================
+# FEATURE VECTORS
+# =====================================
+
+def _features(occupied, head_x, head_y, direction, food_x, food_y, out):
+    """
+    Feature vectors from per-game arrays of cell coordinates.
+
+    Args:
+        occupied: (n, rows, cols) array, non-zero where a body segment is
+        head_x, head_y: (n,) head cells (may be one cell off the board after a wall hit)
+        direction: (n,) clockwise direction indices
+        food_x, food_y: (n,) food cells
+        out: (n, FEATURES) array to fill, any numeric dtype
+    """
+    n, rows, cols = occupied.shape
+    # cells straight ahead, to the right and to the left of every head: (n, 3)
+    turned = (direction[:, None] + TURN) % 4
+    x = head_x[:, None] + DX[turned]
+    y = head_y[:, None] + DY[turned]
+    inside = (x >= 0) & (x < cols) & (y >= 0) & (y < rows)
+    # clipped lookups are only used where the cell is inside the board
+    hit = occupied[np.arange(n)[:, None], np.clip(y, 0, rows - 1), np.clip(x, 0, cols - 1)] != 0
+    out[:, 0:3] = ~inside | hit
+    out[:, 3:7] = direction[:, None] == DIRECTION_ORDER
+    out[:, 7] = food_x < head_x
+    out[:, 8] = food_x > head_x
+    out[:, 9] = food_y < head_y
+    out[:, 10] = food_y > head_y
+
+def game_features(games, out=None):
+    """
+    Agent.get_state features of a list of SnakeGameAI games, computed together.
+
+    Args:
+        games: SnakeGameAI instances with boards of the same size
+        out: Optional (len(games), FEATURES) array to fill, any numeric dtype
+
+    Returns:
+        The filled array (int64 like get_state when out is not given)
+    """
+    n = len(games)
+    if out is None:
+        out = np.empty((n, FEATURES), dtype=np.int64)
+    snake = games[0].snake
+    # one copy of all occupancy grids and one array of the per-game scalars
+    occupied = np.frombuffer(b''.join(game.snake.grid for game in games), dtype=np.uint8)
+    coords = np.array([(game.head.x, game.head.y, game.food.x, game.food.y, CLOCKWISE[game.direction])
+                       for game in games], dtype=np.int64)
+    # pixel coordinates to cells; floor division keeps a head left of or above the board negative
+    cells = coords[:, :4] // BLOCK_SIZE
+    _features(occupied.reshape(n, snake.rows, snake.cols), cells[:, 0], cells[:, 1],
+              coords[:, 4], cells[:, 2], cells[:, 3], out)
+    return out
+
+def vector_features(env, out=None):
+    """
+    Agent.get_state features of every game in a VectorSnakeEnv.
+
+    Args:
+        env: VectorSnakeEnv instance
+        out: Optional (n_envs, FEATURES) array to fill, any numeric dtype
+
+    Returns:
+        The filled array (int64 like get_state when out is not given)
+    """
+    if out is None:
+        out = np.empty((env.n_envs, FEATURES), dtype=np.int64)
+    _features(env.grid, env.head_x, env.head_y, env.direction, env.food_x, env.food_y, out)
+    return out
+
+# =====================================
+# GRID OBSERVATIONS
+# =====================================
+
+def grid_shape(w=640, h=480):
+    """
+    Shape of one grid observation for a board of the given pixel size.
+
+    Returns:
+        Tuple of (channels, rows, cols)
+    """
+    return GRID_CHANNELS, h // BLOCK_SIZE, w // BLOCK_SIZE
+
+# =====================================
+# SINGLE GAME
+# =====================================
+
+def grid_observation(game, out=None):
+    """
+    Grid observation of a SnakeGameAI.
+
+    Args:
+        game: SnakeGameAI instance
+        out: Optional uint8 array of shape grid_shape(game.w, game.h) to fill
+
+    Returns:
+        The filled observation array
+    """
+    snake = game.snake
+    if out is None:
+        out = np.empty((GRID_CHANNELS, snake.rows, snake.cols), dtype=np.uint8)
+    # zero-copy view of the body's occupancy counts
+    cells = np.frombuffer(snake.grid, dtype=np.uint8).reshape(snake.rows, snake.cols)
+    # a count of 2 only occurs when the head has just run into the body
+    np.minimum(cells, 1, out=out[BODY])
+    out[HEAD:] = 0
+    for channel, pt in ((HEAD, snake[0]), (NECK, snake[1]), (FOOD, game.food)):
+        # the head is off the board after it hits a wall
+        if 0 <= pt.x < game.w and 0 <= pt.y < game.h:
+            out[channel, int(pt.y) // BLOCK_SIZE, int(pt.x) // BLOCK_SIZE] = 1
+    return out
+
+# =====================================
+# VECTORIZED GAMES
+# =====================================
+
+def vector_grid_observation(env, out=None):
+    """
+    Grid observations of every game in a VectorSnakeEnv.
+
+    Args:
+        env: VectorSnakeEnv instance
+        out: Optional uint8 array of shape (n_envs, *grid_shape(...)) to fill
+
+    Returns:
+        The filled observation array
+    """
+    n = env.n_envs
+    if out is None:
+        out = np.empty((n, GRID_CHANNELS, env.rows, env.cols), dtype=np.uint8)
+    # the env grid is already 0/1 per cell; reinterpret it without copying
+    out[:, BODY] = env.grid.view(np.uint8)
+    out[:, HEAD:] = 0
+    games = env._all
+    out[games, HEAD, env.head_y, env.head_x] = 1
+    out[games, FOOD, env.food // env.cols, env.food % env.cols] = 1
+    neck = env.body[games, (env.head_ptr - 1) % env.n_cells]
+    out[games, NECK, neck // env.cols, neck % env.cols] = 1
+    return out
@@ -0,0 +1,139 @@
+
+# =====================================
+# PARALLEL EXPERIENCE COLLECTION
+# =====================================
+# Runs K headless SnakeGameAI copies in worker processes. Each worker acts with a
+# snapshot of the learner's Q-network held in shared memory and streams whole
+# episodes back through a queue; the learner trains on them and refreshes the
+# shared snapshot every few updates.
+
+import copy
+import random
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from game import SnakeGameAI
+from agent import Agent, TrainingRun
+
+# =====================================
+# WORKER PROCESS
+# =====================================
+
+def collect_episode(agent, game):
+    """
+    Play one game with the agent's current policy without training.
+
+    Args:
+        agent: Agent used for get_state/get_action
+        game: SnakeGameAI instance (reset on return)
+
+    Returns:
+        Tuple of (states, actions, rewards, next_states, dones, score) with
+        per-step NumPy arrays
+    """
+    states, actions, rewards, next_states, dones = [], [], [], [], []
+    done = False
+    state_old = agent.get_state(game)
+    while not done:
+        final_move = agent.get_action(state_old)
+        reward, done, score = game.play_step(final_move)
+        state_new = agent.get_state(game)
+
+        states.append(state_old)
+        actions.append(final_move.index(1))
+        rewards.append(reward)
+        next_states.append(state_new)
+        dones.append(done)
+        state_old = state_new
+    game.reset()
+    return (np.array(states), np.array(actions), np.array(rewards, dtype=np.float32),
+            np.array(next_states), np.array(dones), score)
+
+def _worker(seed, shared_model, lock, version, n_games, queue, stop, observation):
+    """
+    Collector loop: reload the shared weights when they change, play an episode, send it.
+    """
+    random.seed(seed)
+    torch.manual_seed(seed)
+    torch.set_num_threads(1)
+
+    agent = Agent(max_memory=1, observation=observation) # workers never train, they only act
+    game = SnakeGameAI(headless=True)
+    local_version = -1
+    while not stop.is_set():
+        if version.value != local_version:
+            with lock:
+                agent.model.load_state_dict(shared_model.state_dict())
+                local_version = version.value
+        # follow the learner's epsilon schedule
+        agent.n_games = n_games.value
+        queue.put(collect_episode(agent, game))
+
+# =====================================
+# LEARNER LOOP
+# =====================================
+
+def train_parallel(workers=4, sync_every=10, prioritized=False, dashboard=False,
+                   resume=None, checkpoint_every=50, checkpoint_memory=True,
+                   target_sync=0, tau=0.0, double=False, observation='features'):
+    """
+    Training loop with experience collected by worker processes.
+    The learner only runs replay updates, one per received episode; there is
+    no per-step short-memory training in this mode.
+
+    Args:
+        workers: Number of collector processes
+        sync_every: Replay updates between weight broadcasts
+        prioritized: Use prioritized experience replay
+        dashboard: Start the plot viewer process
+        resume: Checkpoint file to continue from
+        checkpoint_every: Games between checkpoints (0 disables them)
+        checkpoint_memory: Include the replay memory in checkpoints
+        target_sync: Replay updates between hard target network updates (0: none)
+        tau: Polyak factor of soft target network updates (0: none)
+        double: Use the Double-DQN target
+        observation: 'features' or 'grid' (see Agent)
+    """
+    agent = Agent(prioritized=prioritized, target_sync=target_sync, tau=tau, double=double,
+                  observation=observation)
+    run = TrainingRun(agent, resume, dashboard, checkpoint_every, checkpoint_memory)
+
+    # weight snapshot shared with every worker
+    shared_model = copy.deepcopy(agent.model)
+    shared_model.share_memory()
+    lock = mp.Lock()
+    version = mp.Value('i', 0)
+    n_games = mp.Value('i', agent.n_games)
+    queue = mp.Queue(maxsize=4 * workers)
+    stop = mp.Event()
+
+    # worker seeds come from the learner's RNG (restored by --resume), so runs
+    # and resumed runs do not replay the same episodes
+    seeds = [random.randrange(2**32) for _ in range(workers)]
+    procs = [mp.Process(target=_worker, daemon=True,
+                        args=(seed, shared_model, lock, version, n_games, queue, stop, observation))
+             for seed in seeds]
+    for p in procs:
+        p.start()
+
+    updates = 0
+    try:
+        while True:
+            *episode, score = queue.get()
+            agent.memory.extend(*episode)
+            agent.train_long_memory()
+            updates += 1
+            if updates % sync_every == 0:
+                # broadcast: copy the learner's weights into the shared snapshot
+                with lock:
+                    shared_model.load_state_dict(agent.model.state_dict())
+                    version.value += 1
+
+            run.end_game(score)
+            n_games.value = agent.n_games
+    finally:
+        stop.set()
+        for p in procs:
+            p.join(timeout=1)
+            if p.is_alive():
+                p.terminate()
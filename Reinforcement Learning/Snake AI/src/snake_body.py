@@ -0,0 +1,157 @@
+
+# =====================================
+# SNAKE BODY WITH OCCUPANCY GRID
+# =====================================
+# Shared by SnakeGameAI and the human-play SnakeGame.
+# The body is a deque of Points (head first) plus a per-cell occupancy count that
+# is updated incrementally on every move, so collision checks are O(1).
+# A list of free cells is maintained alongside (swap-remove), so food can be
+# placed in O(1) regardless of the snake's length.
+
+import random
+from collections import deque
+
+# =====================================
+# SNAKE BODY CLASS
+# =====================================
+
+class SnakeBody:
+    """
+    Ordered snake segments with an O(1) "is this cell occupied" index.
+    Behaves like the old list for reading: snake[0] is the head, iteration
+    goes head to tail, and `pt in snake` tests occupancy.
+    """
+
+    def __init__(self, w, h, block_size):
+        """
+        Allocate the occupancy grid for a board of the given size.
+
+        Args:
+            w: Board width in pixels
+            h: Board height in pixels
+            block_size: Size of one cell in pixels
+        """
+        self.w = w
+        self.h = h
+        self.block_size = block_size
+        self.cols = w // block_size
+        self.rows = h // block_size
+        self._segments = deque()
+        # segments per cell; 2 only momentarily when the head runs into the body
+        self.grid = bytearray(self.cols * self.rows)
+        # unoccupied cells, and where each cell sits in that list (-1 if occupied)
+        self._free = list(range(self.cols * self.rows))
+        self._free_pos = list(range(self.cols * self.rows))
+
+    def _index(self, pt):
+        """Flat grid index of an in-bounds point."""
+        return int(pt.y) // self.block_size * self.cols + int(pt.x) // self.block_size
+
+    def _in_bounds(self, pt):
+        """True if the point lies on the board."""
+        return 0 <= pt.x <= self.w - self.block_size and 0 <= pt.y <= self.h - self.block_size
+
+    def _occupy(self, idx):
+        """Add a segment to a cell, removing the cell from the free list if it was empty."""
+        self.grid[idx] += 1
+        if self.grid[idx] == 1:
+            # swap-remove: move the last free cell into this cell's slot
+            pos = self._free_pos[idx]
+            last = self._free.pop()
+            if last != idx:
+                self._free[pos] = last
+                self._free_pos[last] = pos
+            self._free_pos[idx] = -1
+
+    def _vacate(self, idx):
+        """Remove a segment from a cell, returning the cell to the free list if it emptied."""
+        self.grid[idx] -= 1
+        if self.grid[idx] == 0:
+            self._free_pos[idx] = len(self._free)
+            self._free.append(idx)
+
+    # =====================================
+    # MOVE AND GROW
+    # =====================================
+
+    def reset(self, points):
+        """
+        Replace the body with the given points, head first.
+
+        Args:
+            points: Iterable of Points from head to tail
+        """
+        for pt in self._segments:
+            if self._in_bounds(pt):
+                self._vacate(self._index(pt))
+        self._segments.clear()
+        for pt in points:
+            self._segments.append(pt)
+            self._occupy(self._index(pt))
+
+    def push_head(self, pt):
+        """
+        Add a new head segment.
+
+        Args:
+            pt: Point the head moved to; a head that left the board is kept
+                in the body but not counted in the grid
+        """
+        self._segments.appendleft(pt)
+        if self._in_bounds(pt):
+            self._occupy(self._index(pt))
+
+    def pop_tail(self):
+        """
+        Remove and return the tail segment.
+        """
+        pt = self._segments.pop()
+        self._vacate(self._index(pt))
+        return pt
+
+    # =====================================
+    # OCCUPANCY QUERIES
+    # =====================================
+
+    def hits(self, pt):
+        """
+        Check whether an on-board point overlaps the body behind the head.
+        Equivalent to the old `pt in snake[1:]`, without copying the list.
+
+        Args:
+            pt: Point on the board
+
+        Returns:
+            True if a segment other than the head occupies the point
+        """
+        count = self.grid[self._index(pt)]
+        if pt == self._segments[0]:
+            count -= 1
+        return count > 0
+
+    def random_free_cell(self, point_type):
+        """
+        Pick a uniformly random unoccupied cell in O(1).
+
+        Args:
+            point_type: Point class used to build the result
+
+        Returns:
+            Top-left pixel coordinates of the cell, or None if the snake fills the board
+        """
+        if not self._free:
+            return None
+        row, col = divmod(self._free[random.randrange(len(self._free))], self.cols)
+        return point_type(col * self.block_size, row * self.block_size)
+
+    def __contains__(self, pt):
+        return self._in_bounds(pt) and self.grid[self._index(pt)] > 0
+
+    def __getitem__(self, idx):
+        return self._segments[idx]
+
+    def __iter__(self):
+        return iter(self._segments)
+
+    def __len__(self):
+        return len(self._segments)
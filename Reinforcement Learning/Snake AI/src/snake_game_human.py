@@ -6,9 +6,9 @@
 # Allows human players to play the classic Snake game
 
 import pygame
-import random
 from enum import Enum
 from collections import namedtuple
+from snake_body import SnakeBody
 
 # Initialize pygame and font
 pygame.init()
@@ -68,9 +68,10 @@ class SnakeGame:
         self.direction = Direction.RIGHT
         
         self.head = Point(self.w/2, self.h/2)
-        self.snake = [self.head, 
-                      Point(self.head.x-BLOCK_SIZE, self.head.y),
-                      Point(self.head.x-(2*BLOCK_SIZE), self.head.y)]
+        self.snake = SnakeBody(self.w, self.h, BLOCK_SIZE)
+        self.snake.reset([self.head,
+                          Point(self.head.x-BLOCK_SIZE, self.head.y),
+                          Point(self.head.x-(2*BLOCK_SIZE), self.head.y)])
         
         self.score = 0
         self.food = None
@@ -82,14 +83,16 @@ class SnakeGame:
         
     def _place_food(self):
         """
-        Randomly place food on the game board.
-        Ensures food doesn't spawn on snake body.
+        Place food on a random free cell of the game board in constant time.
+
+        Returns:
+            False if the snake fills the whole board, so no food can be placed
         """
-        x = random.randint(0, (self.w-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE 
-        y = random.randint(0, (self.h-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE
-        self.food = Point(x, y)
-        if self.food in self.snake:
-            self._place_food()
+        food = self.snake.random_free_cell(Point)
+        if food is None:
+            return False
+        self.food = food
+        return True
 
     # =====================================
     # MAIN GAME LOOP
@@ -120,7 +123,7 @@ class SnakeGame:
         
         # 2. move
         self._move(self.direction) # update the head
-        self.snake.insert(0, self.head)
+        self.snake.push_head(self.head)
         
         # 3. check if game over
         game_over = False
@@ -131,9 +134,12 @@ class SnakeGame:
         # 4. place new food or just move
         if self.head == self.food:
             self.score += 1
-            self._place_food()
+            if not self._place_food():
+                # snake fills the board: the game is won
+                game_over = True
+                return game_over, self.score
         else:
-            self.snake.pop()
+            self.snake.pop_tail()
         
         # 5. update ui and clock
         self._update_ui()
@@ -156,7 +162,7 @@ class SnakeGame:
         if self.head.x > self.w - BLOCK_SIZE or self.head.x < 0 or self.head.y > self.h - BLOCK_SIZE or self.head.y < 0:
             return True
         # hits itself
-        if self.head in self.snake[1:]:
+        if self.snake.hits(self.head):
                         return True
         
         return False
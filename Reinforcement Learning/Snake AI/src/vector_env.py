@@ -0,0 +1,180 @@
+
+# =====================================
+# VECTORIZED SNAKE ENVIRONMENT
+# =====================================
+# Steps N independent Snake games at once using NumPy arrays.
+# Follows the same rules as SnakeGameAI.play_step so transitions collected here
+# are interchangeable with the ones from the single-game environment.
+
+import numpy as np
+from game import BLOCK_SIZE
+
+# Clockwise direction order used by SnakeGameAI._move: RIGHT, DOWN, LEFT, UP
+DX = np.array([1, 0, -1, 0], dtype=np.int64)
+DY = np.array([0, 1, 0, -1], dtype=np.int64)
+
+# Direction change for actions [straight, right turn, left turn]
+TURN = np.array([0, 1, -1], dtype=np.int64)
+
+# =====================================
+# VECTOR ENVIRONMENT CLASS
+# =====================================
+
+class VectorSnakeEnv:
+    """
+    Batch of Snake games stored as NumPy grids and arrays.
+    Every call to step advances all games and resets the finished ones.
+    """
+
+    def __init__(self, n_envs, w=640, h=480, seed=None):
+        """
+        Allocate the state arrays for all games and reset them.
+
+        Args:
+            n_envs: Number of games stepped together
+            w: Board width in pixels (an even number of blocks, like SnakeGameAI)
+            h: Board height in pixels (an even number of blocks, like SnakeGameAI)
+            seed: Optional seed for food placement
+        """
+        self.n_envs = n_envs
+        self.cols = w // BLOCK_SIZE
+        self.rows = h // BLOCK_SIZE
+        self.n_cells = self.cols * self.rows
+        self.rng = np.random.default_rng(seed)
+
+        # occupancy grid (1 where a snake segment is) and a flat view of it
+        self.grid = np.zeros((n_envs, self.rows, self.cols), dtype=np.int8)
+        self._flat_grid = self.grid.reshape(n_envs, self.n_cells)
+
+        # snake bodies as ring buffers of flat cell indices, newest segment at head_ptr
+        self.body = np.zeros((n_envs, self.n_cells), dtype=np.int64)
+        self.head_ptr = np.zeros(n_envs, dtype=np.int64)
+        self.length = np.zeros(n_envs, dtype=np.int64)
+
+        self.head_x = np.zeros(n_envs, dtype=np.int64)
+        self.head_y = np.zeros(n_envs, dtype=np.int64)
+        self.direction = np.zeros(n_envs, dtype=np.int64)
+        self.food = np.zeros(n_envs, dtype=np.int64)
+        self.score = np.zeros(n_envs, dtype=np.int64)
+        self.frame_iteration = np.zeros(n_envs, dtype=np.int64)
+
+        self._all = np.arange(n_envs)
+        self.reset()
+
+    # =====================================
+    # GAME STATE MANAGEMENT
+    # =====================================
+
+    def reset(self, idx=None):
+        """
+        Reset the given games (all games by default) to their initial state.
+
+        Args:
+            idx: Integer array of game indices to reset
+        """
+        if idx is None:
+            idx = self._all
+        if idx.size == 0:
+            return
+
+        # snake of length 3 in the middle of the board heading right
+        x = self.cols // 2
+        y = self.rows // 2
+        start = y * self.cols + x - np.arange(2, -1, -1)
+
+        self._flat_grid[idx] = 0
+        self._flat_grid[idx[:, None], start] = 1
+        self.body[idx, :3] = start
+        self.head_ptr[idx] = 2
+        self.length[idx] = 3
+        self.head_x[idx] = x
+        self.head_y[idx] = y
+        self.direction[idx] = 0
+        self.score[idx] = 0
+        self.frame_iteration[idx] = 0
+        self._place_food(idx)
+
+    def _place_food(self, idx):
+        """
+        Place food uniformly on a free cell for each of the given games.
+        Draws candidate cells for all games at once and retries only the ones
+        that landed on a snake.
+
+        Args:
+            idx: Integer array of game indices that need new food
+        """
+        while idx.size:
+            cells = self.rng.integers(0, self.n_cells, size=idx.size)
+            free = self._flat_grid[idx, cells] == 0
+            self.food[idx[free]] = cells[free]
+            idx = idx[~free]
+
+    @property
+    def food_x(self):
+        """Column of the food in every game."""
+        return self.food % self.cols
+
+    @property
+    def food_y(self):
+        """Row of the food in every game."""
+        return self.food // self.cols
+
+    # =====================================
+    # MAIN GAME LOOP
+    # =====================================
+
+    def step(self, actions):
+        """
+        Execute one step in every game.
+
+        Args:
+            actions: (N,) integer array, 0 = straight, 1 = right turn, 2 = left turn
+
+        Returns:
+            Tuple of (rewards, dones, scores) arrays of shape (N,).
+            Scores are the final scores for games that just ended; those games
+            are reset before returning.
+        """
+        self.frame_iteration += 1
+
+        # 1. move
+        self.direction = (self.direction + TURN[actions]) % 4
+        new_x = self.head_x + DX[self.direction]
+        new_y = self.head_y + DY[self.direction]
+
+        # 2. check if game over (the tail has not moved yet, as in play_step)
+        inside = (new_x >= 0) & (new_x < self.cols) & (new_y >= 0) & (new_y < self.rows)
+        new_cell = np.where(inside, new_y * self.cols + new_x, 0)
+        hit = ~inside | (self._flat_grid[self._all, new_cell] != 0)
+        dones = hit | (self.frame_iteration > 100 * (self.length + 1))
+        rewards = np.where(dones, -10.0, 0.0)
+
+        # 3. advance the heads of the games still running
+        alive = np.flatnonzero(~dones)
+        ptr = (self.head_ptr[alive] + 1) % self.n_cells
+        self.head_ptr[alive] = ptr
+        self.body[alive, ptr] = new_cell[alive]
+        self._flat_grid[alive, new_cell[alive]] = 1
+        self.head_x[alive] = new_x[alive]
+        self.head_y[alive] = new_y[alive]
+
+        # 4. place new food or just move
+        ate = ~dones & (new_cell == self.food)
+        moved = np.flatnonzero(~dones & ~ate)
+        tail = (self.head_ptr[moved] - self.length[moved]) % self.n_cells
+        self._flat_grid[moved, self.body[moved, tail]] = 0
+
+        eaten = np.flatnonzero(ate)
+        self.length[eaten] += 1
+        self.score[eaten] += 1
+        rewards[eaten] = 10.0
+
+        # a snake filling the whole board has won and ends its game
+        full = eaten[self.length[eaten] == self.n_cells]
+        dones[full] = True
+        self._place_food(eaten[self.length[eaten] < self.n_cells])
+
+        # 5. report final scores and restart finished games
+        scores = self.score.copy()
+        self.reset(np.flatnonzero(dones))
+        return rewards, dones, scores
@@ -0,0 +1,564 @@
+
+# =====================================
+# PERFORMANCE BENCHMARKS FOR CONNECT 4 AI
+# =====================================
+# Timing scripts used to check that engine and search changes pay off.
+#
+# Usage:
+#   python benchmark.py bitboard
+#   python benchmark.py search
+#   python benchmark.py tt
+#   python benchmark.py eval
+#   python benchmark.py parallel
+#   python benchmark.py book
+#   python benchmark.py games
+#   python benchmark.py wincheck
+#   python benchmark.py solve
+#   python benchmark.py mcts
+
+import argparse
+import copy
+import itertools
+import os
+import tempfile
+import time
+import random
+import engine
+import game
+from bitboard import Position, RED, YELLOW
+from search import Searcher
+from evaluation import evaluate
+from parallel_search import ParallelSearcher
+from book import OpeningBook, book_positions, generate
+from solver import Solver, end_ply
+from network import PolicyValueNet
+from mcts import MCTS, BatchEvaluator, run_searches
+from selfplay import self_play
+
+# =====================================
+# REFERENCE LIST-OF-STRINGS ENGINE
+# =====================================
+# Copy of the original 6x7 'O'/'R'/'Y' board code, kept only as a timing baseline.
+
+def legacy_valid_columns(board_state):
+    """Columns whose top cell is empty."""
+    return [col for col in range(7) if board_state[0][col] == 'O']
+
+def legacy_make_move(board_copy, col, player):
+    """Place a piece in the lowest empty row of the column."""
+    for row in range(5, -1, -1):
+        if board_copy[row][col] == 'O':
+            board_copy[row][col] = player
+            break
+
+def legacy_check_winner(board_check, player):
+    """Scan all 69 windows for four of the player's pieces."""
+    for r in range(6):
+        for c in range(4):
+            if all(board_check[r][c+i] == player for i in range(4)):
+                return True
+    for r in range(3):
+        for c in range(7):
+            if all(board_check[r+i][c] == player for i in range(4)):
+                return True
+    for r in range(3):
+        for c in range(4):
+            if all(board_check[r+i][c+i] == player for i in range(4)):
+                return True
+    for r in range(3):
+        for c in range(3, 7):
+            if all(board_check[r+i][c-i] == player for i in range(4)):
+                return True
+    return False
+
+def legacy_minimax(board_state, depth, is_maximizing, counter):
+    """
+    The original deepcopy-per-child minimax (valid columns read from board_state).
+    counter[0] is incremented once per node visited.
+    """
+    counter[0] += 1
+    valid_columns = legacy_valid_columns(board_state)
+    is_terminal = (legacy_check_winner(board_state, 'Y') or legacy_check_winner(board_state, 'R')
+                   or len(valid_columns) == 0)
+    if depth == 0 or is_terminal:
+        if legacy_check_winner(board_state, 'Y'):
+            return None, 100
+        if legacy_check_winner(board_state, 'R'):
+            return None, -100
+        return None, 0
+
+    best_col = valid_columns[0]
+    value = -float('inf') if is_maximizing else float('inf')
+    for col in valid_columns:
+        temp_board = copy.deepcopy(board_state)
+        legacy_make_move(temp_board, col, 'Y' if is_maximizing else 'R')
+        new_score = legacy_minimax(temp_board, depth-1, not is_maximizing, counter)[1]
+        if (new_score > value) if is_maximizing else (new_score < value):
+            value = new_score
+            best_col = col
+    return best_col, value
+
+# The same depth-limited minimax on the bitboard Position, which the console
+# game used before the alpha-beta Searcher; the baseline for the bitboard and
+# search benchmarks.
+
+def legacy_bitboard_score(position):
+    """
+    Evaluates the position from the AI's (yellow's) point of view.
+    Returns positive score for wins, negative for losses, neutral for draws.
+    """
+    if position.has_won(YELLOW):
+        return 100
+    elif position.has_won(RED):
+        return -100
+    else:
+        return 0
+
+def legacy_bitboard_minimax(position, depth, is_maximizing):
+    """
+    Minimax algorithm implementation for AI decision making.
+    Recursively evaluates possible moves to find the optimal play.
+    Children are visited by making and unmaking moves on one bitboard Position.
+
+    Args:
+        position: Current bitboard Position (restored on return)
+        depth: Search depth remaining
+        is_maximizing: True if maximizing player (AI), False if minimizing player (human)
+
+    Returns:
+        Tuple of (best_column, best_score)
+    """
+    valid_columns = position.legal_moves()
+    is_terminal = position.has_won(YELLOW) or position.has_won(RED) or len(valid_columns) == 0
+
+    # Base case: reached max depth or terminal state
+    if depth == 0 or is_terminal:
+        return (None, legacy_bitboard_score(position))
+
+    if is_maximizing:
+        # AI turn - maximize score
+        value = -float('inf')
+        best_col = valid_columns[0]
+        for col in valid_columns:
+            position.play(col)
+            new_score = legacy_bitboard_minimax(position, depth-1, False)[1]
+            position.undo()
+            if new_score > value:
+                value = new_score
+                best_col = col
+        return best_col, value
+    else:
+        # Human turn - minimize score
+        value = float('inf')
+        best_col = valid_columns[0]
+        for col in valid_columns:
+            position.play(col)
+            new_score = legacy_bitboard_minimax(position, depth-1, True)[1]
+            position.undo()
+            if new_score < value:
+                value = new_score
+                best_col = col
+        return best_col, value
+
+# =====================================
+# TEST POSITIONS
+# =====================================
+
+def position_from_moves(moves):
+    """
+    Build a Position from a string of 1-based column numbers, e.g. '4455'.
+    """
+    position = Position()
+    for ch in moves:
+        position.play(int(ch) - 1)
+    return position
+
+# Opening, early middle game and crowded middle game, all without a win yet
+POSITIONS = ['', '4453', '44433352', '4443335226156']
+
+# Mid-game positions with their exact solver scores, each checked against a
+# full-depth alpha-beta search without heuristic (which is exact but much slower)
+SOLVER_POSITIONS = [
+    ('5334421535534412', 12),
+    ('6344433437436664', 1),
+    ('7644323344234336', -4),
+    ('6555666544444554', 0),
+    ('25444554514522242527', 5),
+    ('77454445553321454577', 0),
+    ('71464446664471176617', 6),
+    ('31454443335224234555', 0),
+    ('77454445553321', 0),
+    ('11434443335567', 0),
+    ('67444566355453', 1),
+]
+
+def count_nodes(position, depth):
+    """Number of nodes legacy_bitboard_minimax visits from this position at the given depth."""
+    if depth == 0 or position.has_won(RED) or position.has_won(YELLOW) or position.is_full():
+        return 1
+    nodes = 1
+    for col in position.legal_moves():
+        position.play(col)
+        nodes += count_nodes(position, depth - 1)
+        position.undo()
+    return nodes
+
+# =====================================
+# BENCHMARKS
+# =====================================
+
+def bench_bitboard(args):
+    """
+    Node throughput of the original minimax against the bitboard minimax,
+    plus raw make/unmake + win-check throughput.
+    """
+    for moves in POSITIONS:
+        position = position_from_moves(moves)
+        grid = position.to_grid()
+        maximizing = position.player == YELLOW
+
+        counter = [0]
+        start = time.perf_counter()
+        legacy_minimax(grid, args.depth, maximizing, counter)
+        legacy_nps = counter[0] / (time.perf_counter() - start)
+
+        nodes = count_nodes(position, args.depth)
+        start = time.perf_counter()
+        legacy_bitboard_minimax(position, args.depth, maximizing)
+        bitboard_nps = nodes / (time.perf_counter() - start)
+
+        print(f'moves {moves or "-":14} depth {args.depth}: list {legacy_nps:10,.0f} nodes/s  '
+              f'bitboard {bitboard_nps:10,.0f} nodes/s  ({bitboard_nps / legacy_nps:5.1f}x)')
+
+    # move generation and win checks in isolation
+    position = position_from_moves(POSITIONS[-1])
+    grid = position.to_grid()
+    player = 'RY'[position.player]
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        for col in legacy_valid_columns(grid):
+            child = copy.deepcopy(grid)
+            legacy_make_move(child, col, player)
+            legacy_check_winner(child, player)
+    legacy_ops = args.repeats * 7 / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        for col in position.legal_moves():
+            position.play(col)
+            position.last_player_won()
+            position.undo()
+    bitboard_ops = args.repeats * 7 / (time.perf_counter() - start)
+    print(f'make + win check + unmake: list {legacy_ops:10,.0f}/s  bitboard {bitboard_ops:10,.0f}/s  '
+          f'({bitboard_ops / legacy_ops:5.1f}x)')
+
+def bench_search(args):
+    """
+    Depth reached by iterative-deepening alpha-beta in the wall time that the
+    fixed depth-4 minimax needs, on the original list board and on the bitboard.
+    """
+    for moves in POSITIONS:
+        position = position_from_moves(moves)
+        grid = position.to_grid()
+        maximizing = position.player == YELLOW
+
+        start = time.perf_counter()
+        legacy_minimax(grid, 4, maximizing, [0])
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        legacy_bitboard_minimax(position, 4, maximizing)
+        minimax_time = time.perf_counter() - start
+
+        for name, budget in (('list minimax', legacy_time), ('bitboard minimax', minimax_time)):
+            searcher = Searcher()
+            _, _, depth = searcher.search(position, time_budget=budget)
+            print(f'moves {moves or "-":14} {name:17} depth 4 in {budget * 1000:7.1f} ms -> '
+                  f'alpha-beta depth {depth:2} ({searcher.nodes:,} nodes)')
+
+def bench_tt(args):
+    """
+    Nodes and time of fixed-depth searches without and with the transposition
+    table, then hit rates over a self-play game with a table kept between moves.
+    """
+    for moves in POSITIONS:
+        position = position_from_moves(moves)
+        for name, size in (('no table', None), ('table', args.tt_size)):
+            searcher = Searcher(tt_size_log2=size)
+            start = time.perf_counter()
+            searcher.search(position, max_depth=args.search_depth)
+            elapsed = time.perf_counter() - start
+            stats = searcher.stats()
+            hit_rate = f'hit rate {stats["tt_hit_rate"]:5.1%}' if size else ''
+            print(f'moves {moves or "-":14} depth {args.search_depth} {name:9}: '
+                  f'{stats["nodes"]:10,} nodes {elapsed:7.2f} s {hit_rate}')
+
+    # successive moves of one game, fresh table per move vs one table per game
+    for name, reuse in (('fresh table', False), ('kept table', True)):
+        position = Position()
+        searcher = Searcher(tt_size_log2=args.tt_size)
+        nodes, hits, probes = 0, 0, 0
+        start = time.perf_counter()
+        while not position.is_full() and not position.last_player_won():
+            if not reuse:
+                searcher = Searcher(tt_size_log2=args.tt_size)
+            move, _, _ = searcher.search(position, max_depth=args.search_depth)
+            stats = searcher.stats()
+            nodes += stats['nodes']
+            hits += stats['tt_hits']
+            probes += stats['tt_probes']
+            position.play(move)
+        elapsed = time.perf_counter() - start
+        print(f'self-play game, {name:11}: {position.ply} moves {nodes:10,} nodes '
+              f'{elapsed:7.2f} s hit rate {hits / probes:5.1%}')
+
+def play_match_game(searchers, opening, depth):
+    """
+    Play one game between two searchers at a fixed depth after an opening.
+
+    Args:
+        searchers: (first player's searcher, second player's searcher)
+        opening: String of 1-based columns played before the searchers take over
+        depth: Search depth for both sides
+
+    Returns:
+        0 or 1 for the winning searcher, None for a draw
+    """
+    position = position_from_moves(opening)
+    while not position.is_full():
+        searcher = searchers[position.player]
+        move, _, _ = searcher.search(position, max_depth=depth)
+        if position.is_winning_move(move):
+            return position.player
+        position.play(move)
+    return None
+
+def bench_eval(args):
+    """
+    Cost of the heuristic evaluation and its effect on play: evaluations per
+    second, then a fixed-depth match of heuristic vs win/loss-only leaves.
+    """
+    position = position_from_moves(POSITIONS[-1])
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        evaluate(position)
+    print(f'evaluate: {args.repeats / (time.perf_counter() - start):10,.0f} positions/s')
+
+    results = {'heuristic': 0, 'win/loss only': 0, 'draw': 0}
+    openings = [''.join(cols) for cols in itertools.product('1234567', repeat=2)]
+    for opening in openings:
+        for heuristic_first in (True, False):
+            heuristic = Searcher(evaluate=evaluate)
+            plain = Searcher()
+            searchers = (heuristic, plain) if heuristic_first else (plain, heuristic)
+            winner = play_match_game(searchers, opening, args.depth)
+            if winner is None:
+                results['draw'] += 1
+            elif searchers[winner] is heuristic:
+                results['heuristic'] += 1
+            else:
+                results['win/loss only'] += 1
+    print(f'depth {args.depth} match over {2 * len(openings)} games: {results}')
+
+def bench_parallel(args):
+    """
+    Scaling of the root-parallel search: nodes per second and depth reached
+    within a fixed time budget for each worker count.
+    """
+    for workers in args.workers:
+        if workers == 1:
+            searcher = Searcher(evaluate=evaluate, tt_size_log2=args.tt_size)
+        else:
+            searcher = ParallelSearcher(workers, evaluate=evaluate, tt_size_log2=args.tt_size)
+            # start the worker processes before the clock runs
+            searcher.search(Position(), max_depth=1)
+        for moves in POSITIONS:
+            position = position_from_moves(moves)
+            start = time.perf_counter()
+            _, _, depth = searcher.search(position, time_budget=args.budget)
+            elapsed = time.perf_counter() - start
+            stats = searcher.stats()
+            print(f'{workers} worker(s) moves {moves or "-":14}: depth {depth:2} '
+                  f'{stats["nodes"]:10,} nodes {stats["nodes"] / elapsed:10,.0f} nodes/s')
+        if workers > 1:
+            searcher.close()
+
+def bench_book(args):
+    """
+    Opening book lookups against searching the same positions at the
+    aiMove time budget. Builds a small book in a temporary directory.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'book.bin')
+        start = time.perf_counter()
+        count, _ = generate(path, args.book_plies, args.search_depth)
+        print(f'book up to ply {args.book_plies} at depth {args.search_depth}: {count} positions, '
+              f'{os.path.getsize(path):,} bytes, built in {time.perf_counter() - start:.1f} s')
+
+        book = OpeningBook(path)
+        positions = book_positions(args.book_plies)
+        start = time.perf_counter()
+        for _ in range(args.repeats // len(positions) + 1):
+            for position in positions:
+                book.lookup(position)
+        lookups = (args.repeats // len(positions) + 1) * len(positions)
+        print(f'lookup: {(time.perf_counter() - start) / lookups * 1e6:8.2f} us per position')
+        book.close()
+
+    searcher = Searcher(evaluate=evaluate, tt_size_log2=args.tt_size)
+    for position in positions[:4]:
+        start = time.perf_counter()
+        _, _, depth = searcher.search(position, time_budget=args.budget)
+        print(f'search at ply {position.ply}: {(time.perf_counter() - start) * 1000:8.1f} ms '
+              f'(depth {depth})')
+
+def bench_games(args):
+    """
+    Whole games per second through the engine's Game API in one process:
+    random play, then fixed-depth AI self-play.
+    """
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(args.games):
+        match = engine.Game()
+        while not match.over:
+            match.play(rng.choice(match.legal_moves()))
+    print(f'random play: {args.games / (time.perf_counter() - start):10,.0f} games/s')
+
+    games = max(1, args.games // 100)
+    start = time.perf_counter()
+    for i in range(games):
+        match = engine.Game()
+        # a random first move so the games differ
+        match.play(i % engine.COLUMNS)
+        players = (engine.AIPlayer(time_budget=None, max_depth=args.depth),
+                   engine.AIPlayer(time_budget=None, max_depth=args.depth))
+        while not match.over:
+            match.play(players[len(match.moves) % 2].choose_move(match))
+    print(f'depth {args.depth} self-play: {games / (time.perf_counter() - start):10,.1f} games/s')
+
+def bench_wincheck(args):
+    """
+    Cost of the end-of-move checks over random games: the full-board scans
+    for both colours plus a 42-cell scan for a draw, against walking the lines
+    through the placed piece plus the move counter.
+    """
+    rng = random.Random(0)
+    games = []
+    for _ in range(args.games // 10):
+        match = engine.Game()
+        while not match.over:
+            match.play(rng.choice(match.legal_moves()))
+        games.append(match.moves)
+    moves = sum(len(game_moves) for game_moves in games)
+
+    def replay(check):
+        start = time.perf_counter()
+        for game_moves in games:
+            board = engine.Board()
+            for i, col in enumerate(game_moves):
+                piece = 'RY'[i % 2]
+                row = board.drop(col, piece)
+                check(board, row, col, piece)
+        return time.perf_counter() - start
+
+    def full_scan(board, row, col, piece):
+        legacy_check_winner(board.grid, 'R')
+        legacy_check_winner(board.grid, 'Y')
+        any(cell == 'O' for grid_row in board.grid for cell in grid_row)
+
+    def last_move(board, row, col, piece):
+        engine.connects_four(board.grid, row, col)
+        board.is_full()
+
+    baseline = replay(lambda board, row, col, piece: None)
+    scan_time = replay(full_scan) - baseline
+    local_time = replay(last_move) - baseline
+    print(f'{moves:,} moves: full-board scans {scan_time / moves * 1e6:6.2f} us/move  '
+          f'last-move lines {local_time / moves * 1e6:6.2f} us/move  ({scan_time / local_time:5.1f}x)')
+
+def bench_solve(args):
+    """
+    Solve the benchmark positions with a fresh solver each, checking the
+    exact scores and reporting time, nodes and distance to the end of the game.
+    """
+    total_time = 0.0
+    for moves, expected in SOLVER_POSITIONS:
+        position = position_from_moves(moves)
+        solver = Solver()
+        start = time.perf_counter()
+        score = solver.solve(position)
+        elapsed = time.perf_counter() - start
+        total_time += elapsed
+        result = 'draw' if score == 0 else ('win' if score > 0 else 'loss')
+        status = 'ok' if score == expected else f'WRONG (expected {expected})'
+        print(f'moves {moves:22} score {score:+3} ({result:4} at ply {end_ply(score, position.ply)}) '
+              f'{elapsed:7.2f} s {solver.nodes:10,} nodes {status}')
+    print(f'total {total_time:.2f} s')
+
+def bench_mcts(args):
+    """
+    MCTS simulations per second with an untrained network: one leaf per
+    network call, leaves batched within a tree, and leaves batched across
+    concurrent trees; then self-play games per hour.
+    """
+    net = PolicyValueNet().eval()
+    for trees, leaves in ((1, 1), (1, args.leaves), (args.trees, args.leaves)):
+        evaluator = BatchEvaluator(net)
+        searches = [MCTS(position_from_moves(POSITIONS[1])) for _ in range(trees)]
+        start = time.perf_counter()
+        run_searches(searches, evaluator, args.simulations, leaves)
+        elapsed = time.perf_counter() - start
+        simulations = sum(search.simulations for search in searches)
+        print(f'{trees:3} tree(s) x {leaves:2} leaves: {simulations / elapsed:8,.0f} sims/s '
+              f'({evaluator.evaluations / evaluator.batches:6.1f} positions per network call)')
+
+    _, _, _, stats = self_play(net, args.trees, args.simulations, args.leaves)
+    print(f'self-play, {args.trees} concurrent games at {args.simulations} simulations/move: '
+          f'{stats["simulations"] / stats["seconds"]:8,.0f} sims/s '
+          f'{stats["games"] / stats["seconds"] * 3600:8,.0f} games/h')
+
+# =====================================
+# SCRIPT EXECUTION
+# =====================================
+
+BENCHMARKS = {
+    'bitboard': bench_bitboard,
+    'search': bench_search,
+    'tt': bench_tt,
+    'eval': bench_eval,
+    'parallel': bench_parallel,
+    'book': bench_book,
+    'games': bench_games,
+    'wincheck': bench_wincheck,
+    'solve': bench_solve,
+    'mcts': bench_mcts,
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Connect 4 AI performance benchmarks.')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--depth', type=int, default=4,
+                        help='search depth')
+    parser.add_argument('--search-depth', type=int, default=8,
+                        help='depth of fixed-depth alpha-beta searches')
+    parser.add_argument('--tt-size', type=int, default=18,
+                        help='log2 of the transposition table size')
+    parser.add_argument('--repeats', type=int, default=2000,
+                        help='repetitions for micro-benchmarks')
+    parser.add_argument('--budget', type=float, default=game.AI_TIME_BUDGET,
+                        help='seconds per search for time-limited benchmarks')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='worker counts to compare')
+    parser.add_argument('--book-plies', type=int, default=3,
+                        help='deepest ply of the benchmark opening book')
+    parser.add_argument('--games', type=int, default=5000,
+                        help='games played by the games benchmark')
+    parser.add_argument('--simulations', type=int, default=200,
+                        help='MCTS simulations per move')
+    parser.add_argument('--leaves', type=int, default=8,
+                        help='MCTS leaves per tree and network call')
+    parser.add_argument('--trees', type=int, default=32,
+                        help='concurrent MCTS trees (self-play games)')
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
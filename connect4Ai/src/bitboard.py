@@ -0,0 +1,203 @@
+
+# =====================================
+# BITBOARD POSITION FOR CONNECT 4
+# =====================================
+# Represents a 6x7 Connect 4 board as two integer bitmasks (one per player)
+# plus the next free bit of every column.
+#
+# Bit layout: column-major, HEIGHT + 1 bits per column, bottom row first.
+# The extra (sentinel) bit on top of every column keeps shifted lines from
+# wrapping into the next column.
+#
+#    5 12 19 26 33 40 47
+#    4 11 18 25 32 39 46
+#    3 10 17 24 31 38 45
+#    2  9 16 23 30 37 44
+#    1  8 15 22 29 36 43
+#    0  7 14 21 28 35 42     <- bottom row
+#
+# Every position also carries a Zobrist hash, updated with one XOR per move.
+
+import random
+
+WIDTH = 7
+HEIGHT = 6
+H1 = HEIGHT + 1
+
+# Player indices; red always moves first
+RED = 0
+YELLOW = 1
+PIECES = ('R', 'Y')
+
+BOTTOM_MASK = sum(1 << (col * H1) for col in range(WIDTH))
+BOARD_MASK = BOTTOM_MASK * ((1 << HEIGHT) - 1)
+TOP_BITS = [col * H1 + HEIGHT for col in range(WIDTH)]
+
+# Zobrist keys: one random 64-bit number per (player, bit); fixed seed so hashes
+# are stable between runs (and between processes)
+_zobrist_rng = random.Random(20240607)
+ZOBRIST = [[_zobrist_rng.getrandbits(64) for _ in range(WIDTH * H1)] for _ in range(2)]
+
+def connected_four(bitboard):
+    """
+    Check whether a player's bitboard contains four in a row.
+    Each direction is one shift-and-AND pair, so the check is O(1).
+
+    Args:
+        bitboard: Stones of one player
+
+    Returns:
+        True if the stones contain a horizontal, vertical or diagonal line of four
+    """
+    # vertical, horizontal, diagonal /, diagonal \
+    for shift in (1, H1, H1 + 1, H1 - 1):
+        pairs = bitboard & (bitboard >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+# =====================================
+# POSITION CLASS
+# =====================================
+
+class Position:
+    """
+    Connect 4 position with O(1) make/unmake and win detection.
+    """
+
+    __slots__ = ('boards', 'heights', 'moves', 'ply', 'hash')
+
+    def __init__(self):
+        """
+        Create the empty starting position.
+        """
+        self.boards = [0, 0]                                 # stones of RED and YELLOW
+        self.heights = [col * H1 for col in range(WIDTH)]    # next free bit per column
+        self.moves = []                                      # columns played, for undo
+        self.ply = 0                                         # stones on the board
+        self.hash = 0                                        # Zobrist hash of the stones
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Build a position from the game's 6x7 grid of 'O'/'R'/'Y' strings (row 0 at the top).
+        The side to move is inferred from the stone counts.
+
+        Args:
+            grid: List of 6 rows of 7 cells
+
+        Returns:
+            Position equivalent to the grid (its move history starts empty)
+        """
+        position = cls()
+        for col in range(WIDTH):
+            for row in range(HEIGHT - 1, -1, -1):
+                cell = grid[row][col]
+                if cell == 'O':
+                    break
+                player = PIECES.index(cell)
+                position.boards[player] |= 1 << position.heights[col]
+                position.hash ^= ZOBRIST[player][position.heights[col]]
+                position.heights[col] += 1
+                position.ply += 1
+        return position
+
+    def to_grid(self):
+        """
+        Convert back to the game's 6x7 grid of 'O'/'R'/'Y' strings.
+        """
+        grid = [['O'] * WIDTH for _ in range(HEIGHT)]
+        for player, piece in enumerate(PIECES):
+            for col in range(WIDTH):
+                for row in range(HEIGHT):
+                    if self.boards[player] >> (col * H1 + row) & 1:
+                        grid[HEIGHT - 1 - row][col] = piece
+        return grid
+
+    def copy(self):
+        """Return an independent copy of the position."""
+        position = Position()
+        position.boards = self.boards[:]
+        position.heights = self.heights[:]
+        position.moves = self.moves[:]
+        position.ply = self.ply
+        position.hash = self.hash
+        return position
+
+    # =====================================
+    # MOVE GENERATION
+    # =====================================
+
+    @property
+    def player(self):
+        """Index of the side to move (RED or YELLOW)."""
+        return self.ply & 1
+
+    @property
+    def mask(self):
+        """Bitmask of all stones on the board."""
+        return self.boards[0] | self.boards[1]
+
+    def can_play(self, col):
+        """True if the column is not full."""
+        return self.heights[col] < TOP_BITS[col]
+
+    def legal_moves(self):
+        """List of columns that are not full."""
+        return [col for col in range(WIDTH) if self.heights[col] < TOP_BITS[col]]
+
+    def play(self, col):
+        """
+        Drop a stone of the side to move into a column (which must not be full).
+
+        Args:
+            col: Column index 0-6
+        """
+        player = self.ply & 1
+        bit = self.heights[col]
+        self.boards[player] |= 1 << bit
+        self.hash ^= ZOBRIST[player][bit]
+        self.heights[col] = bit + 1
+        self.moves.append(col)
+        self.ply += 1
+
+    def undo(self):
+        """
+        Take back the last move made with play().
+        """
+        col = self.moves.pop()
+        self.ply -= 1
+        bit = self.heights[col] - 1
+        self.heights[col] = bit
+        self.boards[self.ply & 1] ^= 1 << bit
+        self.hash ^= ZOBRIST[self.ply & 1][bit]
+
+    # =====================================
+    # GAME STATE CHECKS
+    # =====================================
+
+    def is_winning_move(self, col):
+        """
+        True if the side to move wins immediately by playing the column.
+        """
+        return connected_four(self.boards[self.ply & 1] | (1 << self.heights[col]))
+
+    def has_won(self, player):
+        """True if the given player has four in a row."""
+        return connected_four(self.boards[player])
+
+    def last_player_won(self):
+        """True if the move just played completed four in a row."""
+        return connected_four(self.boards[(self.ply - 1) & 1])
+
+    def is_full(self):
+        """True if all 42 cells are filled."""
+        return self.ply == WIDTH * HEIGHT
+
+    def key(self):
+        """
+        Unique integer key of the position (side-to-move stones + all stones +
+        bottom row). Adding the mask carries a single marker bit to the top of
+        every column, so the key encodes both colours in 49 bits.
+        """
+        return self.mask + self.boards[self.ply & 1] + BOTTOM_MASK
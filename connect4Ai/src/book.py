@@ -0,0 +1,264 @@
+
+# =====================================
+# OPENING BOOK FOR CONNECT 4
+# =====================================
+# Precomputed best moves for every position up to a given ply, so the AI can
+# answer opening moves with a lookup instead of a search.
+#
+# Each position is first given to the exact solver for a short time budget;
+# if it is solved, the entry is a proven best move. Otherwise (in practice,
+# for every opening position) the entry falls back to a fixed-depth heuristic
+# search, so its move is only as good as that search and is not proven. Such
+# entries are flagged, per entry and in the header, and the AI does not let
+# them override the solver.
+#
+# The book is built offline (python book.py) and stored as a binary
+# open-addressing hash table that is read through a memory map, so opening it
+# costs nothing and a lookup touches a few bytes of the file.
+#
+# File layout (little-endian):
+#   header: magic b'C4BK', version, max ply, depth, log2 of the slot count, flags
+#   slots:  one 64-bit word per slot, 0 when empty, otherwise
+#           key << 15 | solved << 14 | move << 11 | (score + SCORE_BIAS)
+# Scores follow the Searcher convention; solved scores are converted to it.
+# Positions are stored under the smaller key of the position and its mirror
+# image, which halves the book; moves found through the mirror are flipped back.
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from bitboard import Position, WIDTH, H1
+from search import Searcher, SearchTimeout
+from evaluation import evaluate
+from solver import Solver, to_search_score
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+
+MAGIC = b'C4BK'
+VERSION = 2
+HEADER = struct.Struct('<4sHHHHH')
+SLOT = struct.Struct('<Q')
+
+# Header flag: some entries come from the heuristic search, not the solver
+FLAG_HEURISTIC = 1
+
+# Scores are stored as 11-bit unsigned values
+SCORE_BIAS = 1024
+# Fibonacci hashing constant spreading the structured keys over the table
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+COLUMN_MASK = (1 << H1) - 1
+
+def mirror_key(key):
+    """
+    Key of the left-right mirror image of a position.
+
+    Args:
+        key: Position.key() of the position
+
+    Returns:
+        Key with the column order reversed
+    """
+    mirrored = 0
+    for col in range(WIDTH):
+        mirrored = (mirrored << H1) | ((key >> (col * H1)) & COLUMN_MASK)
+    return mirrored
+
+def canonical_key(position):
+    """
+    Key under which a position is stored.
+
+    Returns:
+        Tuple of (key, mirrored), mirrored being True if the mirror image's key was used
+    """
+    key = position.key()
+    mirrored = mirror_key(key)
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+def _slot(key, size_log2):
+    """First slot probed for a key."""
+    return ((key * HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - size_log2)
+
+# =====================================
+# BOOK GENERATION
+# =====================================
+
+def book_positions(max_ply):
+    """
+    Every distinct position up to max_ply (mirror images counted once) that is
+    still undecided, in order of increasing ply.
+
+    Args:
+        max_ply: Deepest ply to include
+
+    Returns:
+        List of Positions
+    """
+    positions = []
+    seen = set()
+    frontier = [Position()]
+    for ply in range(max_ply + 1):
+        next_frontier = []
+        for position in frontier:
+            key, _ = canonical_key(position)
+            if key in seen:
+                continue
+            seen.add(key)
+            positions.append(position)
+            if ply == max_ply:
+                continue
+            for col in position.legal_moves():
+                if position.is_winning_move(col):
+                    continue
+                child = position.copy()
+                child.play(col)
+                next_frontier.append(child)
+        frontier = next_frontier
+    return positions
+
+def generate(path, max_ply, depth, tt_size_log2=20, solve_budget=None, verbose=False):
+    """
+    Solve or search every book position and write the results to a book file.
+
+    Args:
+        path: Output file
+        max_ply: Deepest ply stored in the book
+        depth: Search depth for positions the solver does not finish
+        tt_size_log2: log2 of the transposition table size, shared by all searches
+        solve_budget: Seconds the solver gets per position; None searches every position
+        verbose: Print progress
+
+    Returns:
+        Tuple of (positions written, positions solved)
+    """
+    searcher = Searcher(evaluate=evaluate, tt_size_log2=tt_size_log2)
+    solver = None if solve_budget is None else Solver()
+    entries = {}
+    solved = 0
+    positions = book_positions(max_ply)
+    start = time.perf_counter()
+    for i, position in enumerate(positions):
+        is_solved = False
+        if solver is not None:
+            try:
+                move, score = solver.best_move(position, solve_budget)
+                score = to_search_score(score, position.ply)
+                is_solved = True
+                solved += 1
+            except SearchTimeout:
+                pass
+        if not is_solved:
+            move, score, _ = searcher.search(position, max_depth=depth)
+        key, mirrored = canonical_key(position)
+        entries[key] = (WIDTH - 1 - move if mirrored else move, score, is_solved)
+        if verbose and (i + 1) % 100 == 0:
+            print(f'{i + 1}/{len(positions)} positions ({solved} solved), '
+                  f'{time.perf_counter() - start:.1f} s')
+
+    # keep the table at most half full so probe chains stay short
+    size_log2 = max(4, (2 * len(entries) - 1).bit_length())
+    slots = [0] * (1 << size_log2)
+    for key, (move, score, is_solved) in entries.items():
+        index = _slot(key, size_log2)
+        while slots[index]:
+            index = (index + 1) & ((1 << size_log2) - 1)
+        slots[index] = key << 15 | is_solved << 14 | move << 11 | (score + SCORE_BIAS)
+
+    flags = FLAG_HEURISTIC if solved < len(entries) else 0
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_ply, depth, size_log2, flags))
+        f.write(struct.pack(f'<{len(slots)}Q', *slots))
+    os.replace(tmp_path, path)
+    return len(entries), solved
+
+# =====================================
+# OPENING BOOK CLASS
+# =====================================
+
+class OpeningBook:
+    """
+    Read-only, memory-mapped opening book.
+    """
+
+    def __init__(self, path=BOOK_PATH):
+        """
+        Map a book file written by generate().
+
+        Args:
+            path: Book file
+        """
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_ply, self.depth, self.size_log2, flags = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f'{path} is not a version {VERSION} opening book')
+        # True if some entries are heuristic search results rather than proven moves
+        self.heuristic = bool(flags & FLAG_HEURISTIC)
+        self._mask = (1 << self.size_log2) - 1
+
+    def lookup(self, position):
+        """
+        Find a position in the book.
+
+        Args:
+            position: Position to look up
+
+        Returns:
+            Tuple of (best_column, score, solved), or None if the position is not
+            in the book; solved is False for a heuristic (unproven) move
+        """
+        if position.ply > self.max_ply:
+            return None
+        key, mirrored = canonical_key(position)
+        index = _slot(key, self.size_log2)
+        while True:
+            entry = SLOT.unpack_from(self._map, HEADER.size + index * SLOT.size)[0]
+            if entry == 0:
+                return None
+            if entry >> 15 == key:
+                move = (entry >> 11) & 7
+                score = (entry & 0x7FF) - SCORE_BIAS
+                return (WIDTH - 1 - move if mirrored else move), score, bool(entry >> 14 & 1)
+            index = (index + 1) & self._mask
+
+    def close(self):
+        """Unmap the book file."""
+        self._map.close()
+
+def load_book(path=BOOK_PATH):
+    """
+    Open the book if it has been generated.
+
+    Returns:
+        OpeningBook, or None if the file does not exist
+    """
+    if not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+# =====================================
+# SCRIPT EXECUTION
+# =====================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate the Connect 4 opening book.')
+    parser.add_argument('--plies', type=int, default=4,
+                        help='store every position up to this many stones')
+    parser.add_argument('--depth', type=int, default=10,
+                        help='search depth for positions the solver does not finish')
+    parser.add_argument('--solve-budget', type=float, default=0.2,
+                        help='seconds the solver gets per position before falling back to search')
+    parser.add_argument('--output', default=BOOK_PATH,
+                        help='book file to write')
+    args = parser.parse_args()
+    start = time.perf_counter()
+    count, solved = generate(args.output, args.plies, args.depth,
+                             solve_budget=args.solve_budget, verbose=True)
+    print(f'wrote {count} positions ({solved} solved, {count - solved} heuristic) '
+          f'to {args.output} in {time.perf_counter() - start:.1f} s')
@@ -0,0 +1,269 @@
+
+# =====================================
+# CONNECT 4 ENGINE
+# =====================================
+# Game rules, game state and the AI player as an importable library.
+# Nothing here reads input, prints or exits, and every game lives in its own
+# Game object, so any number of games can be played in one process (the
+# console game in game.py, benchmarks, self-play).
+
+import time
+from bitboard import Position, PIECES
+from search import Searcher, SearchTimeout, MAX_PLY
+from evaluation import evaluate
+from parallel_search import ParallelSearcher
+from solver import Solver
+
+ROWS = 6
+COLUMNS = 7
+EMPTY = 'O'
+
+# =====================================
+# WIN CONDITION CHECKING
+# =====================================
+
+# Row and column steps of the four lines through a cell:
+# vertical, horizontal, and the two diagonals
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+def connects_four(grid, row, col):
+    """
+    Check whether the piece at (row, col) is part of four in a row.
+    Only the four lines through that cell are walked, so checking the last
+    move is enough to detect a win and costs at most 24 cell reads.
+
+    Args:
+        grid: List of 6 rows of 7 cells
+        row: Row of the piece (0 at the top)
+        col: Column of the piece
+
+    Returns:
+        True if the piece completes a line of four or more
+    """
+    piece = grid[row][col]
+    for d_row, d_col in DIRECTIONS:
+        count = 1
+        for sign in (1, -1):
+            r = row + sign * d_row
+            c = col + sign * d_col
+            while 0 <= r < ROWS and 0 <= c < COLUMNS and grid[r][c] == piece:
+                count += 1
+                r += sign * d_row
+                c += sign * d_col
+        if count >= 4:
+            return True
+    return False
+
+# =====================================
+# BOARD CLASS
+# =====================================
+
+class Board:
+    """
+    6x7 grid of 'O'/'R'/'Y' cells, row 0 at the top.
+    """
+
+    def __init__(self, grid=None):
+        """
+        Args:
+            grid: Optional list of 6 rows of 7 cells to start from (copied)
+        """
+        if grid is None:
+            self.grid = [[EMPTY] * COLUMNS for _ in range(ROWS)]
+        else:
+            self.grid = [row[:] for row in grid]
+        # pieces on the board, so a full board is detected without a scan
+        self.count = sum(cell != EMPTY for row in self.grid for cell in row)
+
+    def copy(self):
+        """Return an independent copy of the board."""
+        return Board(self.grid)
+
+    def can_drop(self, col):
+        """True if col is a column index whose top cell is empty."""
+        return 0 <= col < COLUMNS and self.grid[0][col] == EMPTY
+
+    def valid_columns(self):
+        """List of columns that are not full."""
+        return [col for col in range(COLUMNS) if self.grid[0][col] == EMPTY]
+
+    def drop(self, col, piece):
+        """
+        Place a piece in the lowest empty row of a column.
+
+        Args:
+            col: Column index 0-6
+            piece: 'R' or 'Y'
+
+        Returns:
+            Row the piece landed in
+
+        Raises:
+            ValueError: If the column does not exist or is full
+        """
+        if not 0 <= col < COLUMNS:
+            raise ValueError(f'no column {col}')
+        # Find the lowest available row in the selected column
+        for i in range(ROWS):
+            if self.grid[ROWS - 1 - i][col] == EMPTY:
+                self.grid[ROWS - 1 - i][col] = piece
+                self.count += 1
+                return ROWS - 1 - i
+        raise ValueError(f'column {col} is full')
+
+    def is_full(self):
+        """True if there are no empty cells left."""
+        return self.count == ROWS * COLUMNS
+
+    def has_won(self, piece):
+        """
+        True if the piece has four in a row anywhere on the board.
+        Checks the whole board; after a move, connects_four() on the placed
+        piece is enough.
+        """
+        return self.to_position().has_won(PIECES.index(piece))
+
+    def winner(self):
+        """
+        Returns:
+            'R' or 'Y' if that player has four in a row, otherwise None
+        """
+        for piece in ('R', 'Y'):
+            if self.has_won(piece):
+                return piece
+        return None
+
+    def to_position(self):
+        """Bitboard Position of the board, for the search."""
+        return Position.from_grid(self.grid)
+
+# =====================================
+# GAME CLASS
+# =====================================
+
+class Game:
+    """
+    One game of Connect 4: the board, whose turn it is and the result.
+    Red always moves first.
+    """
+
+    def __init__(self):
+        self.board = Board()
+        self.turn = 'R'
+        self.moves = []         # columns played, in order
+        self.winner = None      # 'R' or 'Y' once someone has four in a row
+        self.over = False
+
+    @property
+    def is_draw(self):
+        """True if the game ended with a full board and no winner."""
+        return self.over and self.winner is None
+
+    def legal_moves(self):
+        """Columns the side to move may play (none once the game is over)."""
+        return [] if self.over else self.board.valid_columns()
+
+    def play(self, col):
+        """
+        Play a move for the side to move and update the result.
+
+        Args:
+            col: Column index 0-6
+
+        Returns:
+            Row the piece landed in
+
+        Raises:
+            ValueError: If the game is over or the column is not playable
+        """
+        if self.over:
+            raise ValueError('the game is over')
+        row = self.board.drop(col, self.turn)
+        self.moves.append(col)
+        if connects_four(self.board.grid, row, col):
+            self.winner = self.turn
+            self.over = True
+        elif self.board.is_full():
+            self.over = True
+        self.turn = 'Y' if self.turn == 'R' else 'R'
+        return row
+
+    def position(self):
+        """Bitboard Position of the current board."""
+        return self.board.to_position()
+
+# =====================================
+# AI PLAYER CLASS
+# =====================================
+
+class AIPlayer:
+    """
+    Chooses moves with the opening book, iterative-deepening alpha-beta search
+    and, late in the game, the perfect-play solver.
+    Keeps one searcher (and so one transposition table) for all its moves.
+    """
+
+    def __init__(self, time_budget=1.0, max_depth=MAX_PLY, workers=1, evaluate=evaluate,
+                 tt_size_log2=18, book=None, solve_from=None):
+        """
+        Args:
+            time_budget: Seconds per move; None searches to max_depth
+            max_depth: Deepest search iteration
+            workers: Search processes; above 1 uses ParallelSearcher
+            evaluate: Leaf evaluation function
+            tt_size_log2: log2 of the transposition table size
+            book: Optional OpeningBook consulted before searching; from
+                solve_from on, only its solved (proven) entries are used
+            solve_from: Number of stones on the board from which moves are
+                solved exactly instead of searched; None never solves. The
+                solver gets half of the time budget, and a move it cannot
+                solve in time is searched with the rest
+        """
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.book = book
+        self.solve_from = solve_from
+        self.solver = None if solve_from is None else Solver()
+        self.nodes = 0          # nodes searched (solver and search) for the last move
+        if workers > 1:
+            self.searcher = ParallelSearcher(workers, evaluate=evaluate, tt_size_log2=tt_size_log2)
+        else:
+            self.searcher = Searcher(evaluate=evaluate, tt_size_log2=tt_size_log2)
+
+    def choose_move(self, game):
+        """
+        Pick a column for the side to move.
+
+        Args:
+            game: Game that is not over
+
+        Returns:
+            Column index 0-6
+        """
+        position = game.position()
+        self.nodes = 0
+        solving = self.solver is not None and position.ply >= self.solve_from
+        entry = self.book.lookup(position) if self.book is not None else None
+        # once the solver takes over, only proven book moves are played
+        if entry is not None and (entry[2] or not solving):
+            return entry[0]
+        time_budget = self.time_budget
+        if solving:
+            start = time.perf_counter()
+            try:
+                column, _ = self.solver.best_move(
+                    position, time_budget=None if time_budget is None else time_budget / 2)
+                return column
+            except SearchTimeout:
+                time_budget -= time.perf_counter() - start
+            finally:
+                self.nodes = self.solver.nodes
+        column, _, _ = self.searcher.search(position, max_depth=self.max_depth,
+                                            time_budget=time_budget)
+        self.nodes += self.searcher.nodes
+        return column
+
+    def close(self):
+        """Release search worker processes, if any."""
+        if isinstance(self.searcher, ParallelSearcher):
+            self.searcher.close()
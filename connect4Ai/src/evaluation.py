@@ -0,0 +1,94 @@
+
+# =====================================
+# HEURISTIC EVALUATION FOR CONNECT 4
+# =====================================
+# Scores non-terminal positions so a depth-limited search can tell good
+# positions from bad ones instead of seeing 0 almost everywhere.
+# All lookups are precomputed bitmasks: the 69 windows of four cells, the
+# centre column and the odd/even rows used for threat parity.
+
+from bitboard import WIDTH, HEIGHT, H1, BOTTOM_MASK, BOARD_MASK
+
+# Points for a window holding only one player's stones, by stone count
+WINDOW_WEIGHTS = (0, 0, 2, 5, 0)
+CENTER_WEIGHT = 3
+THREAT_WEIGHT = 8
+
+def _build_windows():
+    """Bitmasks of every horizontal, vertical and diagonal run of four cells."""
+    windows = []
+    for col in range(WIDTH):
+        for row in range(HEIGHT):
+            for d_col, d_row in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                end_col = col + 3 * d_col
+                end_row = row + 3 * d_row
+                if 0 <= end_col < WIDTH and 0 <= end_row < HEIGHT:
+                    window = 0
+                    for i in range(4):
+                        window |= 1 << ((col + i * d_col) * H1 + row + i * d_row)
+                    windows.append(window)
+    return windows
+
+WINDOWS = _build_windows()
+CENTER_MASK = ((1 << HEIGHT) - 1) << ((WIDTH // 2) * H1)
+
+# Rows counted from 1 at the bottom: the first player profits from threats on
+# odd rows, the second player from threats on even rows
+ODD_ROWS = BOTTOM_MASK * 0b010101
+EVEN_ROWS = BOTTOM_MASK * 0b101010
+
+def winning_cells(stones, mask):
+    """
+    Empty cells that would complete four in a row for the given stones.
+
+    Args:
+        stones: Bitboard of one player's stones
+        mask: Bitboard of all stones
+
+    Returns:
+        Bitboard of threat cells
+    """
+    # vertical
+    cells = (stones << 1) & (stones << 2) & (stones << 3)
+    # horizontal and both diagonals: the gap can be at any of the four positions
+    for shift in (H1, H1 - 1, H1 + 1):
+        pair = (stones << shift) & (stones << 2 * shift)
+        cells |= pair & (stones << 3 * shift)
+        cells |= pair & (stones >> shift)
+        pair = (stones >> shift) & (stones >> 2 * shift)
+        cells |= pair & (stones << shift)
+        cells |= pair & (stones >> 3 * shift)
+    return cells & (BOARD_MASK ^ mask)
+
+def evaluate(position):
+    """
+    Heuristic score of a non-terminal position for the side to move.
+    Combines open two- and three-in-a-rows, centre control and threat parity.
+
+    Args:
+        position: Position to score
+
+    Returns:
+        Integer score, well inside the range of search.WIN_SCORE
+    """
+    player = position.ply & 1
+    mine = position.boards[player]
+    theirs = position.boards[player ^ 1]
+    mask = mine | theirs
+
+    score = 0
+    for window in WINDOWS:
+        own = mine & window
+        other = theirs & window
+        if own and not other:
+            score += WINDOW_WEIGHTS[own.bit_count()]
+        elif other and not own:
+            score -= WINDOW_WEIGHTS[other.bit_count()]
+
+    score += CENTER_WEIGHT * ((mine & CENTER_MASK).bit_count() - (theirs & CENTER_MASK).bit_count())
+
+    # threats on the rows that favour their owner under zugzwang
+    my_rows, their_rows = (ODD_ROWS, EVEN_ROWS) if player == 0 else (EVEN_ROWS, ODD_ROWS)
+    score += THREAT_WEIGHT * ((winning_cells(mine, mask) & my_rows).bit_count()
+                              - (winning_cells(theirs, mask) & their_rows).bit_count())
+    return score
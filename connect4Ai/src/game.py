@@ -4,12 +4,24 @@
 # =====================================
 # A console-based Connect 4 game implementation with two modes:
 # - Two-player mode (human vs human)
-# - Single-player mode (human vs AI using minimax algorithm)
+# - Single-player mode (human vs AI using alpha-beta search)
+# The rules and the AI live in engine.py; this file only handles the console.
 
-import copy
 from colorama import init, Fore, Style
+from engine import Game, AIPlayer
+from book import load_book
 init(autoreset=True)
 
+# Seconds the AI may think about each move
+AI_TIME_BUDGET = 1.0
+# Worker processes for the AI search (1 searches in this process; more workers
+# have not been measured to search deeper, see the README scaling table)
+AI_WORKERS = 1
+# Stones on the board from which the AI plays perfectly using the solver
+AI_SOLVE_FROM = 20
+
+NAMES = {'R': 'red', 'Y': 'yellow'}
+
 # =====================================
 # MAIN GAME ENTRY POINT
 # =====================================
@@ -24,108 +36,56 @@ def main():
         print("Press 1 For 2 Player\n")
         print("Press 2 For 1 Player\n")
         print("Press 3 For Quit\n")
-        choose = int(input())            
+        choose = int(input())
         if choose == 1:
             twoPlayer()
         if choose == 2:
             onePlayer()
-        if choose == 3:
-            quit()
 
 # =====================================
 # TWO-PLAYER GAME MODE
 # =====================================
-    
-def twoPlayer():
-    """
-    Initializes and runs a two-player game.
-    Creates a 6x7 board and alternates turns between players until game ends.
-    """
-    global run
-    global board 
-    run = True
-    board = []
-    # Initialize 6x7 board with empty cells ('O')
-    for i in range(6):
-        board.append(['O'] * 7)
-    while(run):
-        getMove()
-        if not checkIfThereIsMove():
-            print("Board Full Game Over\n")
-            quit()
-
-# =====================================
-# GAME STATE MANAGEMENT
-# =====================================
-    
-def checkIfThereIsMove():
-    """
-    Checks if there are any empty cells remaining on the board.
-    Returns True if moves are available, False if board is full.
-    """
-    for i in range(6):
-        for j in range(7):  
-            if board[i][j] == 'O':
-                return True   
-    return False              
 
-def getMove():
+def twoPlayer():
     """
-    Handles the turn sequence for two-player mode.
-    Alternates between red and yellow players, checking for wins after each move.
+    Runs a two-player game.
+    Alternates turns between players until the game ends.
     """
-    redMove()
-    checkWin()
-    yellowMove()
-    checkWin()
-    print("\n ")
+    game = Game()
+    while not game.over:
+        humanMove(game)
+        if game.turn == 'R':
+            print("\n ")
+    showResult(game)
 
 # =====================================
 # PLAYER MOVE HANDLING
 # =====================================
-        
-def redMove():
-    """
-    Handles the red player's move input and placement.
-    Prompts for column selection and places piece in the lowest available row.
-    """
-    while(True):    
-        print("It is red's turn\n")
-        temp = int(input("Please enter a column number 1 , 2, 3, 4, 5, 6, 7\n"))
-        column  = temp -1
-        # Find the lowest available row in the selected column
-        for i in range(6):
-            if board[5-i][column] == 'O':
-                board[5-i][column] = 'R'
-                return
-        print("Please enter legit column\n")
 
-def yellowMove():
+def humanMove(game):
     """
-    Handles the yellow player's move input and placement.
-    Prompts for column selection and places piece in the lowest available row.
+    Handles the move input of the side to move and places its piece.
+    Prompts for column selection until a playable column is entered.
     """
     while(True):
-        print("It is yellow's turn\n")
-        temp = int(input("Please enter a column number 1 , 2, 3, 4, 5, 6, 7 \n"))
+        print(f"It is {NAMES[game.turn]}'s turn\n")
+        temp = int(input("Please enter a column number 1 , 2, 3, 4, 5, 6, 7\n"))
         column  = temp -1
-        # Find the lowest available row in the selected column
-        for i in range(6):
-            if board[5-i][column] == 'O':
-                board[5 - i][column] = 'Y'
-                return
+        if game.board.can_drop(column):
+            game.play(column)
+            return
         print("Please enter legit column\n")
 
 # =====================================
 # BOARD DISPLAY
-# =====================================          
-    
-def boardLook():
+# =====================================
+
+def boardLook(board):
     """
     Displays the current board state with colored output.
     Red pieces appear in red, yellow pieces in yellow, empty cells as 'O'.
     """
-    for row in board:
+    for row in board.grid:
         row_str = ""
         for cell in row:
             if cell == 'R':
@@ -137,131 +97,17 @@ def boardLook():
         print(row_str)
     print("\n")
 
-# =====================================
-# WIN CONDITION CHECKING
-# =====================================
-
-def checkWin():
-    """
-    Main win checking function that calls all win condition checkers.
-    Checks vertical, horizontal, and diagonal wins for both players.
-    """
-    verticalWinforRed()
-    verticalWinforYellow()
-    horizontalWinforRed()   
-    horizontalWinforYellow()
-    crossWinforRed()
-    crossWinforYellow()
-
-def verticalWinforRed():
-    """
-    Checks for vertical win condition (4 in a column) for red player.
-    Displays board and declares victory if found.
-    """
-    for col in range(7):
-        counter = 0
-        for row in range(6):
-            if board[row][col] == 'R':
-                counter += 1
-                if counter == 4:
-                    boardLook()
-                    print("Red Won")
-                    quit()
-            else:
-                counter = 0
-      
-def verticalWinforYellow():
-    """
-    Checks for vertical win condition (4 in a column) for yellow player.
-    Displays board and declares victory if found.
-    """
-    for col in range(7):
-        counter = 0
-        for row in range(6):
-            if board[row][col] == 'Y':
-                counter += 1
-                if counter == 4:
-                    boardLook()
-                    print("Yellow Won")
-                    quit()
-            else:
-                counter = 0
-             
-def horizontalWinforRed():
-    """
-    Checks for horizontal win condition (4 in a row) for red player.
-    Displays board and declares victory if found.
-    """
-    for row in range(6):
-        counter = 0
-        for col in range(7):
-            if board[row][col] == 'R':
-                counter += 1
-                if counter == 4:
-                    boardLook()
-                    print("Red Won")
-                    quit()
-            else:
-                counter = 0
-          
-def horizontalWinforYellow():
-    """
-    Checks for horizontal win condition (4 in a row) for yellow player.
-    Displays board and declares victory if found.
-    """
-    for row in range(6):
-        counter = 0
-        for col in range(7):
-            if board[row][col] == 'Y':
-                counter += 1
-                if counter == 4:
-                    boardLook()
-                    print("Yellow Won")
-                    quit()
-            else:
-                counter = 0
-                      
-def crossWinforRed():
-    """
-    Checks for diagonal win conditions for red player.
-    Checks both positive and negative diagonal directions.
-    """
-    # Check positive diagonal (bottom-left to top-right)
-    for i in range(3):
-        for j in range(4):
-            if board[i][j] == 'R' and board[i+1][j+1] == 'R' and board[i+2][j+2] == 'R' and board[i+3][j+3] == 'R':
-                boardLook()
-                print("Red Won")
-                quit()
-
-    # Check negative diagonal (top-left to bottom-right)
-    for i in range(3):
-        for j in range(3, 7):
-            if board[i][j] == 'R' and board[i+1][j-1] == 'R' and board[i+2][j-2] == 'R' and board[i+3][j-3] == 'R':
-                boardLook()
-                print("Red Won")
-                quit()
-
-def crossWinforYellow():
+def showResult(game):
     """
-    Checks for diagonal win conditions for yellow player.
-    Checks both positive and negative diagonal directions.
+    Displays the final board and announces the winner or a draw.
     """
-    # Check positive diagonal (bottom-left to top-right)
-    for i in range(3):
-        for j in range(4):
-            if board[i][j] == 'Y' and board[i+1][j+1] == 'Y' and board[i+2][j+2] == 'Y' and board[i+3][j+3] == 'Y':
-                boardLook()
-                print("Yellow Won")
-                quit()
-
-    # Check negative diagonal (top-left to bottom-right)
-    for i in range(3):
-        for j in range(3, 7):
-            if board[i][j] == 'Y' and board[i+1][j-1] == 'Y' and board[i+2][j-2] == 'Y' and board[i+3][j-3] == 'Y':
-                boardLook()
-                print("Yellow Won")
-                quit()
+    boardLook(game.board)
+    if game.winner == 'R':
+        print("Red Won")
+    elif game.winner == 'Y':
+        print("Yellow Won")
+    else:
+        print("Board Full Game Over\n")
 
 # =====================================
 # SINGLE-PLAYER MODE (HUMAN VS AI)
@@ -269,158 +115,34 @@ def crossWinforYellow():
 
 def onePlayer():
     """
-    Initializes and runs a single-player game against AI.
-    Human plays as red, AI plays as yellow using minimax algorithm.
-    """
-    global run
-    global board
-    run = True
-    board = []
-    # Initialize 6x7 board with empty cells ('O')
-    for i in range(6):
-        board.append(['O'] * 7)
-    while(run):
-        boardLook()
-        redMove()
-        checkWin()
-        if not checkIfThereIsMove():
-            print("Board Full Game Over\n")
-            quit()
-        aiMove()
-        checkWin()
-        if not checkIfThereIsMove():
-            print("Board Full Game Over\n")
-            quit()
-
-def aiMove():
-    """
-    Executes AI move using minimax algorithm.
-    Determines best column and places yellow piece in lowest available row.
-    """
-    column, _ = minimax(board, 4, True)
-    for i in range(6):
-        if board[5 - i][column] == 'O':
-            board[5 - i][column] = 'Y'
+    Runs a single-player game against AI.
+    Human plays as red, AI plays as yellow using the opening book, alpha-beta search
+    and, from AI_SOLVE_FROM stones on, the perfect-play solver.
+    """
+    game = Game()
+    book = load_book()
+    # one AI player per game so its transposition table carries over between moves
+    ai = AIPlayer(time_budget=AI_TIME_BUDGET, workers=AI_WORKERS, book=book,
+                  solve_from=AI_SOLVE_FROM)
+    try:
+        while not game.over:
+            boardLook(game.board)
+            humanMove(game)
+            if game.over:
+                break
+            column = ai.choose_move(game)
+            game.play(column)
             print("AI moved at column", column+1)
-            return
-
-# =====================================
-# AI UTILITY FUNCTIONS
-# =====================================
-
-def get_valid_columns():
-    """
-    Returns a list of columns that have at least one empty cell.
-    Used by AI to determine available moves.
-    """
-    valid_cols = []
-    for col in range(7):
-        if board[0][col] == 'O':
-            valid_cols.append(col)
-    return valid_cols
-
-def make_move(board_copy, col, player):
-    """
-    Makes a move on a copy of the board for AI simulation.
-    Places the player's piece in the lowest available row of the specified column.
-    """
-    for row in range(5, -1, -1):
-        if board_copy[row][col] == 'O':
-            board_copy[row][col] = player
-            break
-
-def check_winner(board_check, player):
-    """
-    Checks if the specified player has won on the given board state.
-    Returns True if player has 4 in a row (horizontal, vertical, or diagonal).
-    """
-    # Check horizontal wins
-    for r in range(6):
-        for c in range(4):
-            if all(board_check[r][c+i] == player for i in range(4)):
-                return True
-    # Check vertical wins
-    for r in range(3):
-        for c in range(7):
-            if all(board_check[r+i][c] == player for i in range(4)):
-                return True
-    # Check positive diagonal wins
-    for r in range(3):
-        for c in range(4):
-            if all(board_check[r+i][c+i] == player for i in range(4)):
-                return True
-    # Check negative diagonal wins
-    for r in range(3):
-        for c in range(3, 7):
-            if all(board_check[r+i][c-i] == player for i in range(4)):
-                return True
-    return False
-
-def score_position(board_eval, player):
-    """
-    Evaluates the board position for the given player.
-    Returns positive score for wins, negative for losses, neutral for draws.
-    """
-    opponent = 'R' if player == 'Y' else 'Y'
-    if check_winner(board_eval, player):
-        return 100
-    elif check_winner(board_eval, opponent):
-        return -100
-    else:
-        return 0
-
-# =====================================
-# MINIMAX ALGORITHM
-# =====================================
-
-def minimax(board_state, depth, is_maximizing):
-    """
-    Minimax algorithm implementation for AI decision making.
-    Recursively evaluates possible moves to find the optimal play.
-    
-    Args:
-        board_state: Current board configuration
-        depth: Search depth remaining
-        is_maximizing: True if maximizing player (AI), False if minimizing player (human)
-    
-    Returns:
-        Tuple of (best_column, best_score)
-    """
-    valid_columns = get_valid_columns()
-    is_terminal = check_winner(board_state, 'Y') or check_winner(board_state, 'R') or len(valid_columns) == 0
-
-    # Base case: reached max depth or terminal state
-    if depth == 0 or is_terminal:
-        return (None, score_position(board_state, 'Y'))
-
-    if is_maximizing:
-        # AI turn - maximize score
-        value = -float('inf')
-        best_col = valid_columns[0]
-        for col in valid_columns:
-            temp_board = copy.deepcopy(board_state)
-            make_move(temp_board, col, 'Y')
-            new_score = minimax(temp_board, depth-1, False)[1]
-            if new_score > value:
-                value = new_score
-                best_col = col
-        return best_col, value
-    else:
-        # Human turn - minimize score
-        value = float('inf')
-        best_col = valid_columns[0]
-        for col in valid_columns:
-            temp_board = copy.deepcopy(board_state)
-            make_move(temp_board, col, 'R')
-            new_score = minimax(temp_board, depth-1, True)[1]
-            if new_score < value:
-                value = new_score
-                best_col = col
-        return best_col, value
+    finally:
+        ai.close()
+        if book is not None:
+            book.close()
+    showResult(game)
 
 # =====================================
 # GAME EXECUTION
 # =====================================
 
 # Start the game
-main()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+
+# =====================================
+# MONTE CARLO TREE SEARCH WITH BATCHED NETWORK EVALUATION
+# =====================================
+# AlphaZero-style MCTS: moves are selected by PUCT (visit counts, values and
+# network priors), leaves are expanded with the policy/value network, and the
+# move played is the most visited one.
+#
+# Network calls dominate the cost, so leaves are never evaluated one by one:
+# every tree collects several leaves per round (a virtual loss steers the
+# later selections of a round away from paths already taken), the leaves of
+# many trees are gathered, and all of them go through the network in a single
+# forward pass.
+
+import math
+import numpy as np
+import torch
+import torch.nn.functional as F
+from bitboard import WIDTH, HEIGHT
+from network import PLANES, encode_boards
+
+C_PUCT = 1.5
+VIRTUAL_LOSS = 1.0
+DIRICHLET_ALPHA = 0.3
+NOISE_FRACTION = 0.25
+
+# Child markers for moves that end the game, which need no evaluation
+WIN = 'win'
+DRAW = 'draw'
+
+# =====================================
+# TREE NODE
+# =====================================
+
+class Node:
+    """
+    Expanded position. Statistics are stored per move (edge) in lists indexed
+    by column; values are totals from the point of view of the side to move.
+    """
+
+    __slots__ = ('moves', 'priors', 'visits', 'values', 'children', 'total')
+
+    def __init__(self, moves, priors, children):
+        """
+        Args:
+            moves: Legal columns
+            priors: Network prior per column (list of WIDTH floats)
+            children: Per column: WIN or DRAW for moves that end the game, otherwise None
+        """
+        self.moves = moves
+        self.priors = priors
+        self.visits = [0] * WIDTH
+        self.values = [0.0] * WIDTH
+        self.children = children
+        self.total = 0
+
+    def select(self):
+        """Column with the highest PUCT score."""
+        sqrt_total = math.sqrt(self.total + 1)
+        best, best_score = self.moves[0], -float('inf')
+        for col in self.moves:
+            visits = self.visits[col]
+            q = self.values[col] / visits if visits else 0.0
+            score = q + C_PUCT * self.priors[col] * sqrt_total / (1 + visits)
+            if score > best_score:
+                best, best_score = col, score
+        return best
+
+# =====================================
+# SEARCH TREE
+# =====================================
+
+class MCTS:
+    """
+    Search tree of one game, evaluated from outside in batches:
+    select_leaves() hands out positions to evaluate, expand() takes the
+    network outputs back.
+    """
+
+    def __init__(self, position, noise=False, rng=None):
+        """
+        Args:
+            position: Root position (owned by the tree and advanced by play())
+            noise: Mix Dirichlet noise into the root priors (self-play exploration)
+            rng: numpy Generator for the noise
+        """
+        self.position = position
+        self.noise = noise
+        self.rng = rng or np.random.default_rng()
+        self.root = None
+
+    @property
+    def simulations(self):
+        """Simulations backed up at the root so far."""
+        return 0 if self.root is None else self.root.total
+
+    def select_leaves(self, count):
+        """
+        Run up to count selections. Selections that reach a game-ending move
+        are backed up at once; the others stop at an unexpanded position.
+
+        Args:
+            count: Maximum number of selections
+
+        Returns:
+            List of pending leaves (path, current stones, opponent stones, legal
+            columns, child markers) to pass to expand() with their network outputs
+        """
+        if self.root is None:
+            # the root itself has to be evaluated first
+            return [self._leaf([])]
+
+        leaves = []
+        pending = set()
+        position = self.position
+        root_moves = len(position.moves)
+        for _ in range(count):
+            node = self.root
+            path = []
+            collided = False
+            while True:
+                col = node.select()
+                # virtual loss: count the visit now and assume it is lost
+                node.visits[col] += 1
+                node.values[col] -= VIRTUAL_LOSS
+                node.total += 1
+                path.append((node, col))
+                child = node.children[col]
+                if child is WIN:
+                    self._backup(path, 1.0)
+                    break
+                if child is DRAW:
+                    self._backup(path, 0.0)
+                    break
+                position.play(col)
+                if child is None:
+                    if (id(node), col) in pending:
+                        # another selection of this round already waits here
+                        self._revert(path)
+                        collided = True
+                    else:
+                        pending.add((id(node), col))
+                        leaves.append(self._leaf(path))
+                    break
+                node = child
+            while len(position.moves) > root_moves:
+                position.undo()
+            if collided:
+                # the remaining selections would mostly collide as well
+                break
+        return leaves
+
+    def _leaf(self, path):
+        """Everything expand() needs about the current position."""
+        position = self.position
+        player = position.ply & 1
+        moves = position.legal_moves()
+        children = [None] * WIDTH
+        for col in moves:
+            if position.is_winning_move(col):
+                children[col] = WIN
+            elif position.ply + 1 == WIDTH * HEIGHT:
+                children[col] = DRAW
+        return path, position.boards[player], position.boards[player ^ 1], moves, children
+
+    def expand(self, leaves, priors, values):
+        """
+        Create the nodes of evaluated leaves and back up their values.
+
+        Args:
+            leaves: Leaves returned by select_leaves()
+            priors: Move probabilities per leaf (illegal moves already zero)
+            values: Network value per leaf for its side to move
+        """
+        for (path, _, _, moves, children), prior, value in zip(leaves, priors, values):
+            node = Node(moves, prior, children)
+            if not path:
+                if self.noise:
+                    noise = self.rng.dirichlet([DIRICHLET_ALPHA] * len(moves))
+                    for col, eta in zip(moves, noise):
+                        prior[col] = (1 - NOISE_FRACTION) * prior[col] + NOISE_FRACTION * eta
+                self.root = node
+                continue
+            parent, col = path[-1]
+            parent.children[col] = node
+            # the value is for the leaf's side to move, the edge belongs to the parent
+            self._backup(path, -value)
+
+    def _backup(self, path, value):
+        """
+        Add a result along a path, replacing the virtual losses.
+
+        Args:
+            path: (node, column) edges from the root
+            value: Result for the side that made the last move of the path
+        """
+        for node, col in reversed(path):
+            node.values[col] += value + VIRTUAL_LOSS
+            value = -value
+
+    def _revert(self, path):
+        """Undo the virtual losses of an abandoned selection."""
+        for node, col in path:
+            node.visits[col] -= 1
+            node.values[col] += VIRTUAL_LOSS
+            node.total -= 1
+
+    def visit_counts(self):
+        """Root visit count per column, as a numpy array."""
+        return np.array(self.root.visits, dtype=np.float32)
+
+    def play(self, col):
+        """
+        Advance the root by a move, keeping the subtree below it.
+
+        Args:
+            col: Column played
+        """
+        child = self.root.children[col] if self.root is not None else None
+        self.root = child if isinstance(child, Node) else None
+        self.position.play(col)
+        if self.root is not None and self.noise:
+            # fresh exploration noise for the new root
+            moves = self.root.moves
+            noise = self.rng.dirichlet([DIRICHLET_ALPHA] * len(moves))
+            for col, eta in zip(moves, noise):
+                self.root.priors[col] = (1 - NOISE_FRACTION) * self.root.priors[col] + NOISE_FRACTION * eta
+
+# =====================================
+# BATCHED EVALUATION
+# =====================================
+
+class BatchEvaluator:
+    """
+    Runs the network over leaves from any number of trees at once, reusing one
+    input buffer so no per-call tensors are allocated for the inputs.
+    """
+
+    def __init__(self, net, capacity=256):
+        """
+        Args:
+            net: PolicyValueNet
+            capacity: Initial number of positions the input buffer holds
+        """
+        self.net = net
+        self._resize(capacity)
+        self.evaluations = 0
+        self.batches = 0
+
+    def _resize(self, capacity):
+        """(Re)allocate the input buffer and its zero-copy tensor view."""
+        self.buffer = np.zeros((capacity, PLANES, HEIGHT, WIDTH), dtype=np.float32)
+        self.tensor = torch.from_numpy(self.buffer)
+
+    def evaluate(self, leaves):
+        """
+        Evaluate leaves in one forward pass.
+
+        Args:
+            leaves: Leaves from MCTS.select_leaves()
+
+        Returns:
+            Tuple of (priors, values): per leaf, a list of WIDTH move
+            probabilities (0 for illegal moves) and a float value
+        """
+        n = len(leaves)
+        if n > len(self.buffer):
+            self._resize(2 * n)
+        encode_boards([leaf[1] for leaf in leaves], [leaf[2] for leaf in leaves], self.buffer)
+        with torch.inference_mode():
+            logits, values = self.net(self.tensor[:n])
+            mask = torch.full((n, WIDTH), -float('inf'))
+            for i, leaf in enumerate(leaves):
+                mask[i, leaf[3]] = 0.0
+            priors = F.softmax(logits + mask, dim=1)
+        self.evaluations += n
+        self.batches += 1
+        return priors.tolist(), values.tolist()
+
+def run_searches(trees, evaluator, simulations, leaves_per_tree=8):
+    """
+    Search several trees until each has the given number of root simulations.
+
+    Args:
+        trees: MCTS trees (e.g. one per concurrent game)
+        evaluator: BatchEvaluator shared by all trees
+        simulations: Root simulations each tree should reach
+        leaves_per_tree: Leaves a tree contributes to each batch
+    """
+    active = list(trees)
+    while active:
+        batch = []
+        owners = []
+        for tree in active:
+            wanted = min(leaves_per_tree, simulations - tree.simulations)
+            leaves = tree.select_leaves(wanted)
+            batch.extend(leaves)
+            owners.append((tree, len(leaves)))
+        if batch:
+            priors, values = evaluator.evaluate(batch)
+            start = 0
+            for tree, count in owners:
+                tree.expand(batch[start:start + count], priors[start:start + count],
+                            values[start:start + count])
+                start += count
+        active = [tree for tree in active if tree.simulations < simulations]
+
+# =====================================
+# MCTS PLAYER
+# =====================================
+
+class MCTSPlayer:
+    """
+    Plays single games with MCTS, for use outside self-play.
+    Offers the same choose_move(game)/close() interface as engine.AIPlayer.
+    """
+
+    def __init__(self, net, simulations=400, leaves_per_tree=8):
+        """
+        Args:
+            net: Trained PolicyValueNet
+            simulations: Simulations per move
+            leaves_per_tree: Leaves evaluated per network call
+        """
+        self.evaluator = BatchEvaluator(net, capacity=leaves_per_tree)
+        self.simulations = simulations
+        self.leaves_per_tree = leaves_per_tree
+        self.nodes = 0          # simulations run for the last move
+
+    def choose_move(self, game):
+        """
+        Most visited column after searching the current position.
+
+        Args:
+            game: engine.Game that is not over
+
+        Returns:
+            Column index 0-6
+        """
+        tree = MCTS(game.position())
+        run_searches([tree], self.evaluator, self.simulations, self.leaves_per_tree)
+        self.nodes = tree.simulations
+        return int(np.argmax(tree.visit_counts()))
+
+    def close(self):
+        """Nothing to release; present so the player can stand in for an AIPlayer."""
@@ -0,0 +1,171 @@
+
+# =====================================
+# POLICY/VALUE NETWORK FOR CONNECT 4
+# =====================================
+# Small convolutional network for the MCTS player: from a position it predicts
+# a move distribution (policy) and the expected result for the side to move
+# (value, -1 loss .. +1 win).
+#
+# Input: 2 planes of 6x7, stones of the side to move and of the opponent,
+# row 0 at the bottom. Positions are encoded in batches straight from their
+# bitboards into a preallocated array.
+
+import os
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torch.optim as optim
+from bitboard import WIDTH, HEIGHT, H1
+
+PLANES = 2
+# Folder models are saved to and loaded from, relative to the working directory
+MODEL_FOLDER = './model'
+# Bitboard bit of every (row, col) cell, in row-major order
+CELL_BITS = np.array([col * H1 + row for row in range(HEIGHT) for col in range(WIDTH)],
+                     dtype=np.uint64)
+
+def encode_boards(current, opponent, out):
+    """
+    Encode positions into network input planes.
+
+    Args:
+        current: Sequence of bitboards of the side to move
+        opponent: Sequence of bitboards of the other player
+        out: float32 array of shape (>= n, 2, HEIGHT, WIDTH); the first n entries are written
+
+    Returns:
+        View of out holding the n encoded positions
+    """
+    n = len(current)
+    boards = np.array([current, opponent], dtype=np.uint64).T          # (n, 2)
+    bits = (boards[:, :, None] >> CELL_BITS) & np.uint64(1)            # (n, 2, 42)
+    planes = out[:n]
+    planes[...] = bits.reshape(n, PLANES, HEIGHT, WIDTH)
+    return planes
+
+def encode_position(position):
+    """Input planes of a single Position, shape (2, HEIGHT, WIDTH)."""
+    player = position.ply & 1
+    out = np.empty((1, PLANES, HEIGHT, WIDTH), dtype=np.float32)
+    return encode_boards([position.boards[player]], [position.boards[player ^ 1]], out)[0]
+
+# =====================================
+# NETWORK ARCHITECTURE
+# =====================================
+
+class PolicyValueNet(nn.Module):
+    """
+    Convolutional trunk with a policy head (one logit per column) and a value head.
+    """
+
+    def __init__(self, channels=64, blocks=3):
+        """
+        Args:
+            channels: Feature maps in every trunk layer
+            blocks: Number of 3x3 convolution layers after the input layer
+        """
+        super().__init__()
+        self.input = nn.Conv2d(PLANES, channels, 3, padding=1)
+        self.trunk = nn.ModuleList(nn.Conv2d(channels, channels, 3, padding=1) for _ in range(blocks))
+        self.policy_conv = nn.Conv2d(channels, 2, 1)
+        self.policy_fc = nn.Linear(2 * HEIGHT * WIDTH, WIDTH)
+        self.value_conv = nn.Conv2d(channels, 1, 1)
+        self.value_fc1 = nn.Linear(HEIGHT * WIDTH, 64)
+        self.value_fc2 = nn.Linear(64, 1)
+
+    def forward(self, x):
+        """
+        Args:
+            x: Input planes of shape (n, 2, HEIGHT, WIDTH)
+
+        Returns:
+            Tuple of (policy logits of shape (n, WIDTH), values of shape (n,))
+        """
+        x = F.relu(self.input(x))
+        for conv in self.trunk:
+            # residual connection keeps the deeper layers easy to train
+            x = F.relu(x + conv(x))
+        policy = F.relu(self.policy_conv(x)).flatten(1)
+        policy = self.policy_fc(policy)
+        value = F.relu(self.value_conv(x)).flatten(1)
+        value = torch.tanh(self.value_fc2(F.relu(self.value_fc1(value)))).squeeze(1)
+        return policy, value
+
+    def save(self, file_name='connect4_net.pth'):
+        """
+        Save the trained model to disk.
+
+        Args:
+            file_name: Name of the file to save the model
+        """
+        model_folder_path = MODEL_FOLDER
+        if not os.path.exists(model_folder_path):
+            os.makedirs(model_folder_path)
+
+        file_name = os.path.join(model_folder_path, file_name)
+        torch.save(self.state_dict(), file_name)
+
+    @classmethod
+    def load(cls, file_name='connect4_net.pth'):
+        """
+        Load a model written by save(), ready for evaluation.
+
+        Args:
+            file_name: Name of the model file in MODEL_FOLDER
+
+        Returns:
+            PolicyValueNet in evaluation mode
+
+        Raises:
+            FileNotFoundError: If the model has not been trained yet
+        """
+        net = cls()
+        net.load_state_dict(torch.load(os.path.join(MODEL_FOLDER, file_name), weights_only=True))
+        net.eval()
+        return net
+
+# =====================================
+# POLICY/VALUE TRAINER
+# =====================================
+
+class PolicyValueTrainer:
+    """
+    Fits the network to self-play data: cross-entropy towards the MCTS visit
+    distribution plus squared error towards the game result.
+    """
+
+    def __init__(self, model, lr=1e-3, weight_decay=1e-4):
+        """
+        Args:
+            model: PolicyValueNet to train
+            lr: Learning rate
+            weight_decay: L2 regularisation
+        """
+        self.model = model
+        self.optimizer = optim.Adam(model.parameters(), lr=lr, weight_decay=weight_decay)
+
+    def train_step(self, states, policies, values):
+        """
+        One gradient step on a batch.
+
+        Args:
+            states: Input planes of shape (n, 2, HEIGHT, WIDTH)
+            policies: Target move distributions of shape (n, WIDTH)
+            values: Target results of shape (n,) for the side to move
+
+        Returns:
+            Tuple of (policy loss, value loss) as floats
+        """
+        states = torch.as_tensor(states, dtype=torch.float)
+        policies = torch.as_tensor(policies, dtype=torch.float)
+        values = torch.as_tensor(values, dtype=torch.float)
+
+        logits, predicted = self.model(states)
+        policy_loss = -(policies * F.log_softmax(logits, dim=1)).sum(dim=1).mean()
+        value_loss = F.mse_loss(predicted, values)
+
+        self.optimizer.zero_grad()
+        (policy_loss + value_loss).backward()
+        self.optimizer.step()
+        return policy_loss.item(), value_loss.item()
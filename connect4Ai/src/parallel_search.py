@@ -0,0 +1,188 @@
+
+# =====================================
+# ROOT-PARALLEL SEARCH FOR CONNECT 4
+# =====================================
+# Spreads the root moves of each iterative-deepening iteration over worker
+# processes. Every root column is pinned to one worker for the whole game, so
+# the transposition table that searched a move at the previous depth (and on
+# the previous turn) searches it again and can reuse its entries.
+#
+# All workers start at once. They share the best score found so far through a
+# shared-memory value so later moves can be cut off sooner; the value is seeded
+# with the previous iteration's score minus an aspiration margin, which gives
+# the bound a serial search of the first move used to provide. If every move
+# fails low against that seed, the iteration is searched again with a full window.
+
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from search import Searcher, SearchTimeout, MOVE_ORDER, MAX_PLY, WIN_SCORE, is_win_score
+
+# Distance below the previous iteration's score at which the shared bound starts
+ASPIRATION = 50
+
+# =====================================
+# WORKER PROCESS
+# =====================================
+
+_searcher = None
+_alpha = None
+
+def _init_worker(alpha, evaluate, tt_size_log2):
+    """Create the worker's searcher and keep a handle to the shared bound."""
+    global _searcher, _alpha
+    _searcher = Searcher(evaluate=evaluate, tt_size_log2=tt_size_log2)
+    _alpha = alpha
+
+def _search_moves(position, cols, depth, deadline):
+    """
+    Search this worker's root moves to the given depth, one after the other.
+
+    Args:
+        position: Root Position (a pickled copy)
+        cols: Root moves pinned to this worker, in search order
+        depth: Iteration depth (the move itself counts as one ply)
+        deadline: Wall-clock time (time.time()) at which to give up
+
+    Returns:
+        Tuple of (results, nodes): results holds (col, score or None on timeout,
+        exact) per move searched; exact is False when the score is only an
+        upper bound because it failed low against the shared bound. A timeout
+        ends the list.
+    """
+    searcher = _searcher
+    searcher.nodes = 0
+    searcher._deadline = time.perf_counter() + (deadline - time.time())
+    if searcher.table is not None:
+        searcher.table.new_search()
+
+    results = []
+    for col in cols:
+        if position.is_winning_move(col):
+            score = WIN_SCORE - position.ply - 1
+        else:
+            alpha = _alpha.value
+            position.play(col)
+            try:
+                score = -searcher._negamax(position, depth - 1, -WIN_SCORE, -alpha)
+            except SearchTimeout:
+                results.append((col, None, False))
+                break
+            finally:
+                position.undo()
+            if score <= alpha:
+                results.append((col, score, False))
+                continue
+
+        with _alpha.get_lock():
+            if score > _alpha.value:
+                _alpha.value = score
+        results.append((col, score, True))
+    return results, searcher.nodes
+
+# =====================================
+# PARALLEL SEARCHER CLASS
+# =====================================
+
+class ParallelSearcher:
+    """
+    Iterative deepening with the root moves of every iteration split over
+    worker processes, each column always going to the same worker.
+    Offers the same search() interface as Searcher.
+    """
+
+    def __init__(self, workers, evaluate=None, tt_size_log2=18):
+        """
+        Start the worker processes.
+
+        Args:
+            workers: Number of worker processes
+            evaluate: Leaf evaluation function (must be a picklable module-level function)
+            tt_size_log2: log2 of each worker's transposition table size
+        """
+        self.workers = workers
+        self._alpha = multiprocessing.Value('i', -WIN_SCORE)
+        # one single-process pool per worker, so a task goes to a known process
+        self._pools = [ProcessPoolExecutor(1, initializer=_init_worker,
+                                           initargs=(self._alpha, evaluate, tt_size_log2))
+                       for _ in range(workers)]
+        self.nodes = 0
+        self.depth = 0
+
+    def search(self, position, max_depth=MAX_PLY, time_budget=None):
+        """
+        Find the best move for the side to move.
+
+        Args:
+            position: Position to search (not modified)
+            max_depth: Deepest iteration to run
+            time_budget: Seconds available for the move; None searches to max_depth
+
+        Returns:
+            Tuple of (best_column, score, depth_completed)
+        """
+        self.nodes = 0
+        self.depth = 0
+        deadline = float('inf') if time_budget is None else time.time() + time_budget
+
+        moves = [col for col in MOVE_ORDER if position.can_play(col)]
+        best_move, best_score = moves[0], None
+        max_depth = min(max_depth, MAX_PLY - position.ply)
+
+        for depth in range(1, max_depth + 1):
+            seed = -WIN_SCORE if best_score is None else best_score - ASPIRATION
+            result = self._root(position, depth, moves, deadline, seed)
+            if result is not None and result[1] is None:
+                # every move failed low against the aspiration bound
+                result = self._root(position, depth, moves, deadline, -WIN_SCORE)
+            if result is None:
+                break
+            best_move, best_score = result
+            self.depth = depth
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            if is_win_score(best_score):
+                break
+        return best_move, best_score or 0, self.depth
+
+    def _root(self, position, depth, moves, deadline, alpha):
+        """
+        One iteration with every worker searching its own root moves.
+
+        Args:
+            alpha: Starting value of the shared bound
+
+        Returns:
+            (best_move, score); score is None if every move failed low against
+            alpha. None if time ran out before the iteration finished.
+        """
+        self._alpha.value = alpha
+        # moves keep their order (previous best first) within each worker
+        assigned = [[] for _ in self._pools]
+        for col in moves:
+            assigned[col % self.workers].append(col)
+        futures = [pool.submit(_search_moves, position, cols, depth, deadline)
+                   for pool, cols in zip(self._pools, assigned) if cols]
+
+        results = []
+        for future in futures:
+            worker_results, nodes = future.result()
+            results.extend(worker_results)
+            self.nodes += nodes
+        if len(results) < len(moves) or any(score is None for _, score, _ in results):
+            return None
+        exact = [(score, col) for col, score, is_exact in results if is_exact]
+        if not exact:
+            return moves[0], None
+        # a failed-low bound never beats an exact score, so the best exact one is the best move
+        score, col = max(exact, key=lambda entry: entry[0])
+        return col, score
+
+    def stats(self):
+        """Counters from the last search: total nodes over all workers and depth reached."""
+        return {'nodes': self.nodes, 'depth': self.depth}
+
+    def close(self):
+        """Shut down the worker processes."""
+        for pool in self._pools:
+            pool.shutdown(cancel_futures=True)
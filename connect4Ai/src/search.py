@@ -0,0 +1,200 @@
+
+# =====================================
+# ALPHA-BETA SEARCH FOR CONNECT 4
+# =====================================
+# Negamax with alpha-beta pruning over a bitboard Position.
+# Moves are tried centre-first (and the previous iteration's best move first at
+# the root), and the search deepens one ply at a time until a per-move time
+# budget runs out, returning the best move of the last completed depth.
+# A transposition table keyed by the Zobrist hash remembers scores, bounds and
+# best moves, and is kept across searches so later moves of a game reuse it.
+
+import time
+from bitboard import WIDTH, HEIGHT
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+# Scores are from the side to move's point of view. A win is worth
+# WIN_SCORE minus the ply at which it happens, so quicker wins score higher.
+WIN_SCORE = 1000
+MAX_PLY = WIDTH * HEIGHT
+
+# Centre columns take part in more lines of four, so they are searched first
+MOVE_ORDER = [3, 2, 4, 1, 5, 0, 6]
+
+# How many nodes are searched between clock checks
+CHECK_EVERY = 1024
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget is used up."""
+
+def is_win_score(score):
+    """True if the score is a forced win or loss rather than a heuristic value."""
+    return abs(score) > WIN_SCORE - MAX_PLY - 1
+
+# =====================================
+# SEARCHER CLASS
+# =====================================
+
+class Searcher:
+    """
+    Iterative-deepening negamax alpha-beta search.
+    """
+
+    def __init__(self, evaluate=None, tt_size_log2=18):
+        """
+        Args:
+            evaluate: Function scoring a non-terminal Position for the side to
+                move; defaults to 0 (only wins and losses are recognised)
+            tt_size_log2: Transposition table holds 2**tt_size_log2 entries;
+                None disables the table
+        """
+        self.evaluate = evaluate or (lambda position: 0)
+        self.table = None if tt_size_log2 is None else TranspositionTable(tt_size_log2)
+        self.nodes = 0
+        self.depth = 0
+        self._deadline = None
+
+    def search(self, position, max_depth=MAX_PLY, time_budget=None):
+        """
+        Find the best move for the side to move.
+
+        Args:
+            position: Position to search (restored on return)
+            max_depth: Deepest iteration to run
+            time_budget: Seconds available for the move; None searches to max_depth
+
+        Returns:
+            Tuple of (best_column, score, depth_completed)
+        """
+        self.nodes = 0
+        self.depth = 0
+        self._deadline = None if time_budget is None else time.perf_counter() + time_budget
+        if self.table is not None:
+            self.table.new_search()
+            self.table.reset_stats()
+
+        moves = [col for col in MOVE_ORDER if position.can_play(col)]
+        best_move, best_score = moves[0], 0
+        max_depth = min(max_depth, MAX_PLY - position.ply)
+        root_moves = len(position.moves)
+
+        for depth in range(1, max_depth + 1):
+            try:
+                move, score = self._root(position, depth, moves)
+            except SearchTimeout:
+                # unwind the moves that were on the board when time ran out
+                while len(position.moves) > root_moves:
+                    position.undo()
+                break
+            best_move, best_score, self.depth = move, score, depth
+            # search the best move first in the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+            if is_win_score(score):
+                break
+        return best_move, best_score, self.depth
+
+    def _root(self, position, depth, moves):
+        """Search every root move to the given depth and return (best_move, score)."""
+        alpha, beta = -WIN_SCORE, WIN_SCORE
+        best_move = moves[0]
+        for col in moves:
+            if position.is_winning_move(col):
+                return col, WIN_SCORE - position.ply - 1
+            position.play(col)
+            score = -self._negamax(position, depth - 1, -beta, -alpha)
+            position.undo()
+            if score > alpha:
+                alpha = score
+                best_move = col
+        if self.table is not None:
+            self.table.store(position.hash, depth, EXACT, alpha, best_move)
+        return best_move, alpha
+
+    def _negamax(self, position, depth, alpha, beta):
+        """
+        Alpha-beta negamax.
+
+        Args:
+            position: Position to search (restored on return)
+            depth: Plies left to search
+            alpha: Lower bound the side to move is already guaranteed
+            beta: Upper bound the opponent is already guaranteed
+
+        Returns:
+            Score of the position for the side to move
+        """
+        self.nodes += 1
+        if self._deadline is not None and self.nodes % CHECK_EVERY == 0:
+            if time.perf_counter() > self._deadline:
+                raise SearchTimeout()
+
+        # an immediate win is always the best move
+        for col in MOVE_ORDER:
+            if position.can_play(col) and position.is_winning_move(col):
+                return WIN_SCORE - position.ply - 1
+        if position.ply == MAX_PLY:
+            return 0
+        if depth == 0:
+            return self.evaluate(position)
+
+        # reuse what an earlier visit of this position found
+        table = self.table
+        tt_move = None
+        alpha_orig = alpha
+        if table is not None:
+            index = table.probe(position.hash)
+            if index >= 0:
+                tt_move = table.moves[index]
+                if table.depths[index] >= depth:
+                    flag = table.flags[index]
+                    score = table.scores[index]
+                    if flag == EXACT:
+                        return score
+                    if flag == LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score
+
+        best = -WIN_SCORE
+        best_move = None
+        moves = MOVE_ORDER if tt_move is None else [tt_move] + [c for c in MOVE_ORDER if c != tt_move]
+        for col in moves:
+            if not position.can_play(col):
+                continue
+            position.play(col)
+            score = -self._negamax(position, depth - 1, -beta, -alpha)
+            position.undo()
+            if score > best:
+                best = score
+                best_move = col
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if table is not None:
+            if best <= alpha_orig:
+                flag = UPPER
+            elif best >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            table.store(position.hash, depth, flag, best, best_move)
+        return best
+
+    def stats(self):
+        """
+        Counters from the last search.
+
+        Returns:
+            Dict with nodes, depth and transposition table probes, hits and hit rate
+        """
+        stats = {'nodes': self.nodes, 'depth': self.depth}
+        if self.table is not None:
+            stats.update(tt_probes=self.table.probes, tt_hits=self.table.hits,
+                         tt_hit_rate=self.table.hit_rate(), tt_stores=self.table.stores,
+                         tt_replacements=self.table.replacements)
+        return stats
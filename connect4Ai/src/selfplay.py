@@ -0,0 +1,173 @@
+
+# =====================================
+# SELF-PLAY TRAINING FOR THE MCTS PLAYER
+# =====================================
+# AlphaZero-style training loop:
+# 1. play a batch of games concurrently, every move searched with MCTS and
+#    all trees' leaves evaluated together in one forward pass,
+# 2. store each position with its root visit distribution and the final result,
+#    plus its mirror image,
+# 3. train the policy/value network on a window of the most recent positions.
+# Throughput is reported as simulations per second and games per hour.
+#
+# Usage:
+#   python selfplay.py --iterations 20 --games 32 --simulations 100
+
+import argparse
+import time
+import numpy as np
+import torch
+from bitboard import Position, WIDTH, HEIGHT
+from network import PolicyValueNet, PolicyValueTrainer, PLANES, encode_position
+from mcts import MCTS, BatchEvaluator, run_searches
+
+MODEL_FILE = 'connect4_net.pth'
+
+# =====================================
+# SELF-PLAY
+# =====================================
+
+def self_play(net, games, simulations, leaves_per_tree=8, temperature_moves=8, rng=None):
+    """
+    Play games of the network against itself, all at the same time.
+
+    Args:
+        net: PolicyValueNet used for every evaluation
+        games: Number of concurrent games
+        simulations: MCTS simulations per move
+        leaves_per_tree: Leaves each tree adds to a batch
+        temperature_moves: Moves sampled in proportion to visits before
+            switching to the most visited move
+        rng: numpy Generator for noise and move sampling
+
+    Returns:
+        Tuple of (states, policies, values, stats): training arrays including
+        mirror images, and a dict with games, moves, simulations, seconds and evaluations
+    """
+    rng = rng or np.random.default_rng()
+    evaluator = BatchEvaluator(net, capacity=games * leaves_per_tree)
+    trees = [MCTS(Position(), noise=True, rng=rng) for _ in range(games)]
+    histories = [[] for _ in range(games)]    # (state, policy, player) per move
+    results = [None] * games                  # winner (0/1) or -1 for a draw
+    total_simulations = 0
+    moves = 0
+    start = time.perf_counter()
+
+    active = list(range(games))
+    while active:
+        # a kept subtree already has visits; count only the new simulations
+        before = sum(trees[g].simulations for g in active)
+        run_searches([trees[g] for g in active], evaluator, simulations, leaves_per_tree)
+        total_simulations += sum(trees[g].simulations for g in active) - before
+        for g in active:
+            tree = trees[g]
+            position = tree.position
+            visits = tree.visit_counts()
+            policy = visits / visits.sum()
+            histories[g].append((encode_position(position), policy, position.ply & 1))
+            if position.ply < temperature_moves:
+                col = int(rng.choice(WIDTH, p=policy))
+            else:
+                col = int(np.argmax(visits))
+            moves += 1
+            if position.is_winning_move(col):
+                results[g] = position.ply & 1
+            elif position.ply + 1 == WIDTH * HEIGHT:
+                results[g] = -1
+            tree.play(col)
+        active = [g for g in active if results[g] is None]
+
+    states, policies, values = [], [], []
+    for history, winner in zip(histories, results):
+        for state, policy, player in history:
+            value = 0.0 if winner == -1 else (1.0 if winner == player else -1.0)
+            # the board is symmetric under a left-right flip
+            for flip in (False, True):
+                states.append(state[:, :, ::-1] if flip else state)
+                policies.append(policy[::-1] if flip else policy)
+                values.append(value)
+    stats = {'games': games, 'moves': moves, 'simulations': total_simulations,
+             'seconds': time.perf_counter() - start, 'evaluations': evaluator.evaluations}
+    return (np.array(states, dtype=np.float32), np.array(policies, dtype=np.float32),
+            np.array(values, dtype=np.float32), stats)
+
+# =====================================
+# TRAINING LOOP
+# =====================================
+
+def train(iterations, games, simulations, leaves_per_tree=8, window=50_000,
+          batch_size=256, steps=100, seed=None):
+    """
+    Alternate self-play and network training, saving the model after every iteration.
+
+    Args:
+        iterations: Self-play/training rounds
+        games: Games per round, played concurrently
+        simulations: MCTS simulations per move
+        leaves_per_tree: Leaves each tree adds to a batch
+        window: Most recent training positions kept
+        batch_size: Positions per gradient step
+        steps: Gradient steps per round
+        seed: Seed for reproducible runs
+
+    Returns:
+        The trained PolicyValueNet
+    """
+    rng = np.random.default_rng(seed)
+    if seed is not None:
+        torch.manual_seed(seed)
+    net = PolicyValueNet()
+    trainer = PolicyValueTrainer(net)
+    states = np.empty((0, PLANES, HEIGHT, WIDTH), dtype=np.float32)
+    policies = np.empty((0, WIDTH), dtype=np.float32)
+    values = np.empty((0,), dtype=np.float32)
+
+    for iteration in range(1, iterations + 1):
+        net.eval()
+        new_states, new_policies, new_values, stats = self_play(
+            net, games, simulations, leaves_per_tree, rng=rng)
+        states = np.concatenate([states, new_states])[-window:]
+        policies = np.concatenate([policies, new_policies])[-window:]
+        values = np.concatenate([values, new_values])[-window:]
+
+        net.train()
+        start = time.perf_counter()
+        policy_loss = value_loss = 0.0
+        for _ in range(steps):
+            batch = rng.integers(0, len(states), size=min(batch_size, len(states)))
+            policy_loss, value_loss = trainer.train_step(states[batch], policies[batch], values[batch])
+        train_time = time.perf_counter() - start
+        net.save(MODEL_FILE)
+
+        seconds = stats['seconds']
+        print(f'iteration {iteration}: {stats["games"]} games {stats["moves"]} moves '
+              f'{stats["simulations"] / seconds:8,.0f} sims/s '
+              f'{stats["games"] / seconds * 3600:8,.0f} games/h '
+              f'{stats["evaluations"] / seconds:8,.0f} evals/s | '
+              f'train {train_time:5.1f} s policy loss {policy_loss:.3f} value loss {value_loss:.3f} '
+              f'({len(states):,} positions)')
+    return net
+
+# =====================================
+# SCRIPT EXECUTION
+# =====================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the Connect 4 MCTS player by self-play.')
+    parser.add_argument('--iterations', type=int, default=20,
+                        help='self-play/training rounds')
+    parser.add_argument('--games', type=int, default=32,
+                        help='concurrent self-play games per round')
+    parser.add_argument('--simulations', type=int, default=100,
+                        help='MCTS simulations per move')
+    parser.add_argument('--leaves', type=int, default=8,
+                        help='leaves each tree adds to a network batch')
+    parser.add_argument('--steps', type=int, default=100,
+                        help='gradient steps per round')
+    parser.add_argument('--batch-size', type=int, default=256,
+                        help='positions per gradient step')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='random seed')
+    args = parser.parse_args()
+    train(args.iterations, args.games, args.simulations, args.leaves,
+          batch_size=args.batch_size, steps=args.steps, seed=args.seed)
@@ -0,0 +1,256 @@
+
+# =====================================
+# PERFECT-PLAY SOLVER FOR CONNECT 4
+# =====================================
+# Computes the exact game-theoretic value of a position, following the
+# approach of Pascal Pons' solver:
+# - negamax over raw bitboards (stones of the side to move + all stones),
+# - never considers moves that hand the opponent an immediate win, and plays
+#   forced blocks at once (anticipation of losing moves),
+# - orders moves by the number of winning cells they create, centre first on ties,
+# - keeps upper and lower bounds per position in a transposition table,
+# - finds the exact score by a binary search of null-window searches.
+# Solving can take seconds in the middle game, so a call can be given a time
+# budget and then raises SearchTimeout when it runs out; the bounds stored so
+# far stay valid.
+#
+# Score of a position for the side to move:
+#    0  draw
+#   >0  win; the larger, the sooner: (43 - stones on the board before the
+#       winning move) // 2, i.e. the number of own stones left to play,
+#       counting the winning one
+#   <0  loss, same scale from the opponent's side
+
+import time
+from bitboard import WIDTH, HEIGHT, H1, BOTTOM_MASK, BOARD_MASK
+from evaluation import winning_cells
+from search import MOVE_ORDER, WIN_SCORE, CHECK_EVERY, SearchTimeout
+
+MAX_PLY = WIDTH * HEIGHT
+COLUMN_MASKS = [((1 << HEIGHT) - 1) << (col * H1) for col in range(WIDTH)]
+
+def end_ply(score, ply):
+    """
+    Number of stones on the board when the game ends under perfect play.
+    Inverts score = (43 - stones on the board before the winning move) // 2;
+    the division loses one bit, which the winner's parity restores.
+
+    Args:
+        score: Solver score of the position
+        ply: Stones on the board in the position
+
+    Returns:
+        Stones on the board once the winning move is played, or 42 for a draw
+    """
+    if score == 0:
+        return MAX_PLY
+    end = MAX_PLY + 1 - 2 * abs(score)
+    # the winner's stones land on plies of one parity
+    winner_parity = (ply + 1) % 2 if score > 0 else ply % 2
+    if end % 2 != winner_parity:
+        end += 1
+    return end
+
+def to_search_score(score, ply):
+    """
+    Convert a solver score to the Searcher convention (WIN_SCORE minus the ply
+    of the win), so solved and searched scores can be compared.
+    """
+    if score == 0:
+        return 0
+    value = WIN_SCORE - end_ply(score, ply)
+    return value if score > 0 else -value
+
+# =====================================
+# SOLVER CLASS
+# =====================================
+
+class Solver:
+    """
+    Exact Connect 4 solver. The transposition table is kept between calls,
+    so solving successive positions of one game gets cheaper.
+    """
+
+    def __init__(self, table_limit=1 << 21):
+        """
+        Args:
+            table_limit: Entries kept in each bound table before it is cleared
+        """
+        self.table_limit = table_limit
+        self.upper = {}
+        self.lower = {}
+        self.nodes = 0
+        self._deadline = None
+
+    def reset(self):
+        """Drop all stored bounds."""
+        self.upper.clear()
+        self.lower.clear()
+
+    def solve(self, position, weak=False, time_budget=None):
+        """
+        Exact score of a position for the side to move.
+
+        Args:
+            position: Position that is not already won or full
+            weak: Only find out win (1), draw (0) or loss (-1), which is faster
+            time_budget: Seconds available; None solves without a limit
+
+        Returns:
+            Solver score (see the module comment)
+
+        Raises:
+            SearchTimeout: The time budget ran out before the score was found
+        """
+        self._deadline = None if time_budget is None else time.perf_counter() + time_budget
+        return self._solve(position, weak)
+
+    def _solve(self, position, weak):
+        """solve() under the deadline already set."""
+        self.nodes = 0
+        current = position.boards[position.ply & 1]
+        mask = position.mask
+        ply = position.ply
+        if ply == MAX_PLY:
+            return 0
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        if winning_cells(current, mask) & possible:
+            return 1 if weak else (MAX_PLY + 1 - ply) // 2
+
+        low = -((MAX_PLY - ply) // 2)
+        high = (MAX_PLY + 1 - ply) // 2
+        if weak:
+            low, high = -1, 1
+        # binary search with null windows, probing near 0 first where most
+        # positions fall
+        while low < high:
+            med = low + (high - low) // 2
+            if med <= 0 and int(low / 2) < med:
+                med = int(low / 2)
+            elif med >= 0 and int(high / 2) > med:
+                med = int(high / 2)
+            result = self._negamax(current, mask, ply, med, med + 1)
+            if result <= med:
+                high = result
+            else:
+                low = result
+        if weak:
+            # null-window bounds may overshoot the -1..1 window
+            return (low > 0) - (low < 0)
+        return low
+
+    def best_move(self, position, time_budget=None):
+        """
+        Solve every move of a position.
+
+        Args:
+            position: Position that is not already won or full (restored on return)
+            time_budget: Seconds available for all moves; None solves without a limit
+
+        Returns:
+            Tuple of (best_column, score of the position)
+
+        Raises:
+            SearchTimeout: The time budget ran out before every move was solved
+        """
+        self._deadline = None if time_budget is None else time.perf_counter() + time_budget
+        nodes = 0
+        best_move, best_score = None, None
+        for col in MOVE_ORDER:
+            if not position.can_play(col):
+                continue
+            if position.is_winning_move(col):
+                self.nodes = nodes
+                return col, (MAX_PLY + 1 - position.ply) // 2
+            position.play(col)
+            try:
+                score = -self._solve(position, weak=False)
+            finally:
+                position.undo()
+            nodes += self.nodes
+            if best_score is None or score > best_score:
+                best_move, best_score = col, score
+        self.nodes = nodes
+        return best_move, best_score
+
+    def _negamax(self, current, mask, ply, alpha, beta):
+        """
+        Negamax with alpha-beta pruning on raw bitboards.
+        The side to move must not have an immediate win.
+
+        Args:
+            current: Stones of the side to move
+            mask: All stones
+            ply: Number of stones
+            alpha: Score the side to move is already guaranteed
+            beta: Score the opponent is already guaranteed
+
+        Returns:
+            Exact score if it lies strictly between alpha and beta, otherwise a bound
+            on the same side of the window
+        """
+        self.nodes += 1
+        if self._deadline is not None and self.nodes % CHECK_EVERY == 0:
+            if time.perf_counter() > self._deadline:
+                raise SearchTimeout()
+
+        # moves that do not give the opponent a win next turn
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        opponent_wins = winning_cells(current ^ mask, mask)
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                # two threats at once cannot both be blocked
+                return -((MAX_PLY - ply) // 2)
+            possible = forced
+        non_losing = possible & ~(opponent_wins >> 1)
+        if not non_losing:
+            return -((MAX_PLY - ply) // 2)
+        if ply >= MAX_PLY - 2:
+            return 0
+
+        # the opponent cannot win on their next move, so the loss is at least one move later
+        low = -((MAX_PLY - 2 - ply) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+        # nor can we win on this move
+        high = (MAX_PLY - 1 - ply) // 2
+        key = current + mask + BOTTOM_MASK
+        bound = self.upper.get(key)
+        if bound is not None and bound < high:
+            high = bound
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+        bound = self.lower.get(key)
+        if bound is not None and alpha < bound:
+            alpha = bound
+            if alpha >= beta:
+                return alpha
+
+        # most new winning cells first; sort is stable, so ties stay centre first
+        moves = []
+        for col in MOVE_ORDER:
+            move = non_losing & COLUMN_MASKS[col]
+            if move:
+                moves.append((winning_cells(current | move, mask | move).bit_count(), move))
+        moves.sort(key=lambda entry: -entry[0])
+
+        for _, move in moves:
+            score = -self._negamax(current ^ mask, mask | move, ply + 1, -beta, -alpha)
+            if score >= beta:
+                self._store(self.lower, key, score)
+                return score
+            if score > alpha:
+                alpha = score
+        self._store(self.upper, key, alpha)
+        return alpha
+
+    def _store(self, table, key, score):
+        """Remember a bound, emptying the table when it reaches its size limit."""
+        if len(table) >= self.table_limit:
+            table.clear()
+        table[key] = score
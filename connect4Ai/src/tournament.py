@@ -0,0 +1,295 @@
+
+# =====================================
+# SELF-PLAY TOURNAMENT FOR CONNECT 4 ENGINES
+# =====================================
+# Plays engine configurations against each other without any console input,
+# spread over worker processes, and reports the strength and speed of each:
+# win/draw/loss counts, score, Elo, search nodes per second and average time
+# per move. Used to check that a speed-up does not weaken play.
+#
+# Every pair of engines plays every opening twice, once with each colour.
+#
+# Usage:
+#   python tournament.py
+#   python tournament.py --engine d6:depth=6 --engine fast:time=0.1 --opening-plies 2
+#   python tournament.py --engine d4:depth=4 --engine mcts:mcts=200
+
+import argparse
+import itertools
+import math
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from bitboard import Position, WIDTH, PIECES
+from search import MAX_PLY
+from evaluation import evaluate
+from engine import Game, AIPlayer
+from book import load_book
+from network import PolicyValueNet, MODEL_FOLDER
+from mcts import MCTSPlayer
+from selfplay import MODEL_FILE
+
+# One engine setup. depth caps the iterative deepening, time is the per-move
+# budget in seconds (None: search to depth), eval names a leaf evaluation in
+# EVALUATIONS, tt is log2 of the transposition table size (None: no table),
+# solve is the number of stones from which moves are solved exactly (None: never),
+# book says whether the opening book is consulted and workers is the number of
+# search processes. Each engine plays as an engine.AIPlayer built from these,
+# unless mcts is set: then it is an mcts.MCTSPlayer running that many
+# simulations per move with the self-play network, and the other options do
+# not apply.
+# For MCTS engines the nodes/s column counts simulations.
+EngineConfig = namedtuple('EngineConfig', 'name, depth, time, eval, tt, solve, book, workers, mcts',
+                          defaults=(MAX_PLY, None, 'heuristic', 18, None, False, 1, None))
+
+EVALUATIONS = {
+    'heuristic': evaluate,
+    'none': None,
+}
+
+DEFAULT_ENGINES = [
+    EngineConfig('depth2', depth=2),
+    EngineConfig('depth4', depth=4),
+    EngineConfig('depth6', depth=6),
+    EngineConfig('depth6-noeval', depth=6, eval='none'),
+]
+# the MCTS player joins once selfplay.py has trained its network
+if os.path.exists(os.path.join(MODEL_FOLDER, MODEL_FILE)):
+    DEFAULT_ENGINES.append(EngineConfig('mcts400', mcts=400))
+
+# Elo points per factor of 10 in the odds of winning
+ELO_SCALE = 400
+
+def parse_engine(spec):
+    """
+    Parse an --engine argument such as 'fast:time=0.1,eval=none'.
+
+    Args:
+        spec: name, optionally followed by ':' and comma-separated key=value pairs
+
+    Returns:
+        EngineConfig
+    """
+    name, _, options = spec.partition(':')
+    fields = {}
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        if key == 'eval':
+            if value not in EVALUATIONS:
+                raise argparse.ArgumentTypeError(f'unknown evaluation {value!r}')
+            fields['eval'] = value
+        elif key in ('depth', 'tt', 'solve', 'mcts'):
+            fields[key] = None if value == 'none' else int(value)
+        elif key == 'book':
+            if value not in ('yes', 'no'):
+                raise argparse.ArgumentTypeError(f'book must be yes or no, not {value!r}')
+            fields['book'] = value == 'yes'
+        elif key == 'workers':
+            fields['workers'] = int(value)
+        elif key == 'time':
+            fields['time'] = float(value)
+        else:
+            raise argparse.ArgumentTypeError(f'unknown engine option {key!r}')
+    return EngineConfig(name, **fields)
+
+# =====================================
+# GAME PLAY (WORKER PROCESSES)
+# =====================================
+
+def make_player(config, book=None):
+    """
+    Build the player an engine configuration describes.
+
+    Args:
+        config: EngineConfig
+        book: OpeningBook for an AIPlayer, or None
+
+    Returns:
+        AIPlayer or MCTSPlayer; close() it after the game
+    """
+    if config.mcts is not None:
+        return MCTSPlayer(PolicyValueNet.load(MODEL_FILE), simulations=config.mcts)
+    return AIPlayer(time_budget=config.time, max_depth=config.depth, workers=config.workers,
+                    evaluate=EVALUATIONS[config.eval], tt_size_log2=config.tt,
+                    book=book, solve_from=config.solve)
+
+def play_game(engines, opening):
+    """
+    Play one game between two engine configurations.
+
+    Args:
+        engines: (first player's EngineConfig, second player's EngineConfig)
+        opening: Columns (0-6) played before the engines take over
+
+    Returns:
+        Tuple of (winner, stats): winner is 0 or 1 for the engine that won,
+        None for a draw; stats holds [nodes, moves, seconds] per engine
+    """
+    books = [load_book() if config.book else None for config in engines]
+    players = [make_player(config, book) for config, book in zip(engines, books)]
+    stats = [[0, 0, 0.0], [0, 0, 0.0]]
+    game = Game()
+    try:
+        for col in opening:
+            game.play(col)
+        while not game.over:
+            side = len(game.moves) & 1
+            start = time.perf_counter()
+            game.play(players[side].choose_move(game))
+            stats[side][0] += players[side].nodes
+            stats[side][1] += 1
+            stats[side][2] += time.perf_counter() - start
+    finally:
+        for player in players:
+            player.close()
+        for book in books:
+            if book is not None:
+                book.close()
+    return (None if game.winner is None else PIECES.index(game.winner)), stats
+
+def _play_pairing(task):
+    """Worker entry point: play one scheduled game and tag it with its engine indices."""
+    first, second, engines, opening = task
+    winner, stats = play_game(engines, opening)
+    return first, second, winner, stats
+
+def openings(plies):
+    """
+    Every legal sequence of the given number of opening moves that leaves the
+    game undecided (no overfilled column, no move that already wins).
+
+    Args:
+        plies: Length of the sequences
+
+    Returns:
+        List of column tuples
+    """
+    sequences = [()]
+    for _ in range(plies):
+        extended = []
+        for sequence in sequences:
+            position = Position()
+            for col in sequence:
+                position.play(col)
+            for col in range(WIDTH):
+                if position.can_play(col) and not position.is_winning_move(col):
+                    extended.append(sequence + (col,))
+        sequences = extended
+    return sequences
+
+# =====================================
+# RESULTS
+# =====================================
+
+def elo_ratings(results):
+    """
+    Elo ratings fitted to all game results (Bradley-Terry model, draws count
+    as half a win). One virtual draw per pairing keeps a perfect score finite.
+
+    Args:
+        results: Dict mapping (i, j) engine index pairs to [wins of i, draws, wins of j]
+
+    Returns:
+        List of ratings, averaging 0
+    """
+    count = 1 + max(max(pair) for pair in results)
+    points = [0.0] * count
+    games = {}
+    for (i, j), (wins, draws, losses) in results.items():
+        points[i] += wins + 0.5 * draws + 0.5
+        points[j] += losses + 0.5 * draws + 0.5
+        games[i, j] = games[j, i] = games.get((i, j), 0) + wins + draws + losses + 1
+
+    strength = [1.0] * count
+    for _ in range(1000):
+        updated = []
+        for i in range(count):
+            denominator = sum(n / (strength[i] + strength[j])
+                              for (a, j), n in games.items() if a == i)
+            updated.append(points[i] / denominator if denominator else strength[i])
+        change = max(abs(math.log(new / old)) for new, old in zip(updated, strength))
+        strength = updated
+        if change < 1e-9:
+            break
+    ratings = [ELO_SCALE * math.log10(s) for s in strength]
+    mean = sum(ratings) / count
+    return [rating - mean for rating in ratings]
+
+def run_tournament(engines, opening_plies=1, workers=1):
+    """
+    Play every pair of engines over every opening, both colours.
+
+    Args:
+        engines: List of EngineConfigs
+        opening_plies: Length of the forced openings
+        workers: Worker processes playing games in parallel
+
+    Returns:
+        Tuple of (results, totals): results maps (i, j) to [wins of i, draws,
+        wins of j]; totals holds [nodes, moves, seconds] per engine
+    """
+    tasks = []
+    for i, j in itertools.combinations(range(len(engines)), 2):
+        for opening in openings(opening_plies):
+            tasks.append((i, j, (engines[i], engines[j]), opening))
+            tasks.append((j, i, (engines[j], engines[i]), opening))
+
+    results = {pair: [0, 0, 0] for pair in itertools.combinations(range(len(engines)), 2)}
+    totals = [[0, 0, 0.0] for _ in engines]
+    with ProcessPoolExecutor(workers) as pool:
+        for first, second, winner, stats in pool.map(_play_pairing, tasks, chunksize=4):
+            for index, (nodes, moves, seconds) in zip((first, second), stats):
+                totals[index][0] += nodes
+                totals[index][1] += moves
+                totals[index][2] += seconds
+            if first < second:
+                pair, column = (first, second), {0: 0, None: 1, 1: 2}[winner]
+            else:
+                pair, column = (second, first), {1: 0, None: 1, 0: 2}[winner]
+            results[pair][column] += 1
+    return results, totals
+
+def report(engines, results, totals, elapsed):
+    """Print the standings table and the pairwise results."""
+    ratings = elo_ratings(results)
+    print(f'{"engine":16} {"games":>6} {"win":>5} {"draw":>5} {"loss":>5} {"score":>7} '
+          f'{"elo":>6} {"nodes/s":>10} {"ms/move":>8}')
+    for index in sorted(range(len(engines)), key=lambda k: -ratings[k]):
+        wins = draws = losses = 0
+        for (i, j), (w, d, l) in results.items():
+            if i == index:
+                wins, draws, losses = wins + w, draws + d, losses + l
+            elif j == index:
+                wins, draws, losses = wins + l, draws + d, losses + w
+        games = wins + draws + losses
+        nodes, moves, seconds = totals[index]
+        print(f'{engines[index].name:16} {games:6} {wins:5} {draws:5} {losses:5} '
+              f'{(wins + 0.5 * draws) / games:7.1%} {ratings[index]:+6.0f} '
+              f'{nodes / seconds if seconds else 0:10,.0f} {seconds / moves * 1000 if moves else 0:8.1f}')
+    print()
+    for (i, j), (w, d, l) in results.items():
+        print(f'{engines[i].name} vs {engines[j].name}: +{w} ={d} -{l}')
+    print(f'\n{sum(map(sum, results.values()))} games in {elapsed:.1f} s')
+
+# =====================================
+# SCRIPT EXECUTION
+# =====================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Connect 4 engine self-play tournament.')
+    parser.add_argument('--engine', type=parse_engine, action='append', dest='engines',
+                        help="engine as name[:depth=N,time=S,eval=heuristic|none,tt=N|none,solve=N,"
+                             "book=yes|no,workers=N] or name:mcts=SIMULATIONS; repeatable")
+    parser.add_argument('--opening-plies', type=int, default=1,
+                        help='every opening of this many moves is played with both colours')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes playing games')
+    args = parser.parse_args()
+
+    engines = args.engines or DEFAULT_ENGINES
+    if len(engines) < 2:
+        parser.error('a tournament needs at least two engines')
+    start = time.perf_counter()
+    results, totals = run_tournament(engines, args.opening_plies, args.workers)
+    report(engines, results, totals, time.perf_counter() - start)
@@ -0,0 +1,99 @@
+
+# =====================================
+# TRANSPOSITION TABLE
+# =====================================
+# Fixed-size hash table of search results keyed by Zobrist hash.
+# Entries live in parallel lists indexed by the low bits of the hash, which is
+# much lighter in CPython than one object per entry.
+
+# Bound types of a stored score
+EXACT = 0   # score is the exact value
+LOWER = 1   # search failed high: the value is at least score
+UPPER = 2   # search failed low: the value is at most score
+
+class TranspositionTable:
+    """
+    Depth-preferred transposition table with aging.
+    A slot is overwritten when it is empty, holds the same position, was written
+    during an earlier search, or holds a shallower result.
+    """
+
+    def __init__(self, size_log2=18):
+        """
+        Allocate the table.
+
+        Args:
+            size_log2: Table holds 2**size_log2 entries
+        """
+        self.size = 1 << size_log2
+        self.mask = self.size - 1
+        self.keys = [None] * self.size
+        self.depths = [0] * self.size
+        self.flags = [EXACT] * self.size
+        self.scores = [0] * self.size
+        self.moves = [None] * self.size
+        self.ages = [0] * self.size
+        self.age = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the probe/hit/store counters."""
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def new_search(self):
+        """Mark the start of a new search so older entries become replaceable."""
+        self.age += 1
+
+    def clear(self):
+        """Drop all entries (e.g. at the start of a new game)."""
+        self.keys = [None] * self.size
+        self.age = 0
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key: Zobrist hash of the position
+
+        Returns:
+            Slot index of the entry, or -1 if the position is not stored
+        """
+        self.probes += 1
+        index = key & self.mask
+        if self.keys[index] == key:
+            self.hits += 1
+            return index
+        return -1
+
+    def store(self, key, depth, flag, score, move):
+        """
+        Store a search result, subject to the replacement policy.
+
+        Args:
+            key: Zobrist hash of the position
+            depth: Depth the position was searched to
+            flag: EXACT, LOWER or UPPER
+            score: Score found
+            move: Best move found (or None)
+        """
+        index = key & self.mask
+        stored = self.keys[index]
+        if stored is not None and stored != key:
+            if self.ages[index] == self.age and self.depths[index] > depth:
+                return
+            self.replacements += 1
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.flags[index] = flag
+        self.scores[index] = score
+        self.moves[index] = move
+        self.ages[index] = self.age
+        self.stores += 1
+
+    def hit_rate(self):
+        """Fraction of probes that found their position."""
+        return self.hits / self.probes if self.probes else 0.0